@@ -9,6 +9,8 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 # --- [파일 경로 설정] ---
 MODEL_PATH = os.path.join(BASE_DIR, "models", "test_model.h5")
+TFLITE_MODEL_PATH = os.path.join(BASE_DIR, "models", "test_model.tflite")
+ONNX_MODEL_PATH = os.path.join(BASE_DIR, "models", "test_model.onnx")
 YOLO_PATH = os.path.join(BASE_DIR, "models", "license_plate_detector.pt")
 CSV_FILE = "violations_log.csv"
 TEMP_VIDEO_DIR = "temp_videos"
@@ -17,10 +19,122 @@ if not os.path.exists(TEMP_VIDEO_DIR):
     os.makedirs(TEMP_VIDEO_DIR)
 
 # --- [AI 파라미터] ---
+# import 시점에 AI 모델을 미리 로드할지 여부 (스텁 모델로 벤치마크할 때만 false)
+AI_PRELOAD_MODELS = os.getenv("AI_PRELOAD_MODELS", "true").lower() == "true"
+
 SEQUENCE_LENGTH = 50
 STEP_SIZE = 10
 CATEGORIES = ['신호위반', '중앙선침범', '진로변경위반']
 
+# TF 위반 분류 모델 입력/배치 설정
+TF_INPUT_SIZE = (128, 128)   # (width, height) - cv2.resize 기준
+TF_WINDOW_BATCH = 4          # 한 번에 모아서 predict 하는 윈도우 수 (메모리 상한 결정)
+TF_PREDICT_BATCH = 2         # model.predict 내부 batch_size
+MIN_CONFIDENCE = 0.5         # 최고 확률이 이 값 미만이면 위반 아님(정상)으로 간주
+# 위반 분류 모델 추론 백엔드: keras(.h5) / tflite / onnx  (convert_model.py로 변환)
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "keras")
+CLASSIFIER_THREADS = int(os.getenv("CLASSIFIER_THREADS", "0"))  # tflite/onnx 추론 스레드 수 (0이면 기본값)
+
+# YOLO 객체 탐지 (best.pt) 설정
+YOLO_CONF = 0.4              # 확신도 40% 이상만 감지
+YOLO_BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "8"))        # 한 번에 추론할 프레임 수
+# N프레임마다 1장만 탐지 (기본 1 = 전 프레임, 기존 "YOLO 감지" 요약과 동일). 5 정도로 올리면 탐지 비용 약 1/5
+YOLO_DETECT_STRIDE = int(os.getenv("YOLO_DETECT_STRIDE", "1"))
+# cascade: TF 판정이 위반일 때만 최고 확률 구간 프레임에 대해 YOLO 실행 / full: 영상 전체 탐지
+# (기본값 full: 영상 전체 탐지 결과로 "YOLO 감지" 요약을 만드는 기존 동작 유지. cascade는 배포별로 선택)
+DETECTION_MODE = os.getenv("DETECTION_MODE", "full")
+
+# 분석 FPS: 원본이 이보다 높으면 디코딩 단계에서 프레임을 건너뛰어 맞춤 (0이면 원본 FPS 그대로)
+# 예) 30으로 두면 60fps 영상도 SEQUENCE_LENGTH(50) = 약 1.7초 구간이 됨
+ANALYSIS_FPS = float(os.getenv("ANALYSIS_FPS", "0"))
+
+# 정차/주차 구간 모션 게이트: 축소 프레임 차분으로 거의 변화 없는 프레임을 정적 구간으로 처리
+# off: 사용 안 함 / repeat: 정적 프레임은 탐지 생략 + 마지막 움직임 프레임으로 대체 / drop: TF 윈도우에서 제외
+MOTION_GATE_MODE = os.getenv("MOTION_GATE_MODE", "off")
+MOTION_THRESHOLD = float(os.getenv("MOTION_THRESHOLD", "2.5"))  # 평균 밝기 차(0~255) 기준
+MOTION_GATE_SIZE = (32, 32)                                     # 차분 계산용 축소 크기
+
+# 1차 디코딩 중 원본 프레임 보관 메모리 상한(MB): (대기 윈도우 + 후보 윈도우) 프레임이 이보다 크면 보관하지 않고
+# 분석이 끝난 뒤 후보 윈도우만 seek 해서 다시 디코딩 (0이면 항상 재디코딩)
+# 기본값 기준 보관 프레임은 최대 130장(예측 대기 80장 + 후보 윈도우 50장) -> 720p 약 343MB, 1080p 약 771MB, 1080p까지는 디코딩 1회, 4K부터 재디코딩
+PLATE_FRAME_BUDGET_MB = int(os.getenv("PLATE_FRAME_BUDGET_MB", "1024"))
+
+# --- [번호판 OCR 파라미터] ---
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "16"))  # 구간 내 번호판 크롭을 몇 장씩 묶어 OCR 엔진에 넣을지
+# OCR 엔진 조합: "cascade" = 주 엔진 결과가 형식/확신도 기준을 넘으면 그대로 채택, 아니면 보조 엔진 실행
+#                "all"     = 모든 엔진 실행 후 확신도 높은 결과 채택 (느리지만 정확도 우선)
+OCR_MODE = os.getenv("OCR_MODE", "cascade")
+OCR_PRIMARY_ENGINE = os.getenv("OCR_PRIMARY_ENGINE", "paddle")  # paddle | easy
+OCR_CASCADE_MIN_CONF = 0.7      # 주 엔진 결과를 그대로 채택할 최소 확신도
+# 번호판 트래킹: 같은 번호판을 프레임마다 OCR 하지 않고 트랙별 상위 k장만 OCR
+PLATE_TRACK_IOU = 0.3           # 이전 박스와 IoU가 이 이상이면 같은 번호판
+PLATE_TRACK_MAX_MISSED = 10     # 이 프레임 수 이상 안 보이면 트랙 종료
+PLATE_TRACK_MIN_HITS = 2        # 최소 검출 횟수 (미만이면 오검출로 간주)
+PLATE_TRACK_TOP_K = int(os.getenv("PLATE_TRACK_TOP_K", "3"))  # 트랙당 OCR 할 크롭 수
+# 글자 자리별 투표: 번호판 형식(앞 2~3자리 숫자 + 한글 + 뒤 4자리 숫자)으로 맞춘 뒤 자리마다 확신도 가중 투표
+# (false면 문자열 전체 단위 투표)
+PLATE_POSITIONAL_VOTING = os.getenv("PLATE_POSITIONAL_VOTING", "true").lower() == "true"
+# 크롭 품질 점수: 선명도(라플라시안 분산) x 면적 x 가로세로비 x 검출 확신도로 순위를 매겨 상위 크롭만 전처리/OCR
+PLATE_QUALITY_SCORING = os.getenv("PLATE_QUALITY_SCORING", "true").lower() == "true"
+PLATE_SHARPNESS_HEIGHT = 32     # 선명도 비교용 정규화 높이 (크롭 크기와 무관하게 비교)
+PLATE_SHARPNESS_REF = 100.0     # 라플라시안 분산이 이 값이면 선명도 점수 0.5 (흔들린 크롭일수록 0에 가까움)
+PLATE_ASPECT_RANGE = (2.0, 5.0) # 번호판 가로/세로 비 정상 범위 (구형 2단 ~ 신형 1단)
+PLATE_SEGMENT_TOP_K = int(os.getenv("PLATE_SEGMENT_TOP_K", "0"))  # 구간 전체 OCR 크롭 상한 (0이면 트랙별 상한만 적용)
+# OCR 결과 캐시: 크롭의 지각 해시(dHash)가 거의 같으면(해밍 거리 이하) 전처리/OCR 없이 이전 결과 재사용
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "512"))  # 보관할 최대 결과 수 (LRU)
+OCR_CACHE_HASH_SIZE = (32, 8)   # dHash 격자 (가로, 세로) = 256비트 - 번호판 글자 차이를 구분할 만큼 촘촘하게
+OCR_CACHE_MAX_DISTANCE = 6      # 같은 크롭으로 볼 최대 해밍 거리 (비트 수)
+# OCR 전처리 노이즈 제거 프로필: auto(크롭 크기/노이즈 추정으로 선택) | none | bilateral | nlm_fast | nlm(기존 고정값)
+PREPROC_DENOISE = os.getenv("PREPROC_DENOISE", "auto")
+PREPROC_NOISE_LOW = 2.0         # 추정 노이즈 표준편차가 이 미만이면 노이즈 제거 생략
+PREPROC_NOISE_HIGH = 8.0        # 이 이상이면서 작은 크롭이면 nlm_fast, 그 외에는 bilateral
+PREPROC_SMALL_CROP_HEIGHT = 40  # 원본 크롭 높이(px)가 이 미만이면 작은 크롭
+PREPROC_BUFFER_SHAPES = 32      # 크롭 크기별 재사용 버퍼를 몇 종류까지 보관할지 (LRU)
+# 차량 영역(ROI) 번호판 탐지: best.pt 차량 박스 안에서만 번호판 탐지 (크롭을 모아 작은 입력 크기로 배치 추론)
+# 차량이 없거나 차량 영역에서 번호판을 못 찾은 프레임만 축소한 전체 프레임으로 탐지
+PLATE_ROI_MODE = os.getenv("PLATE_ROI_MODE", "true").lower() == "true"
+PLATE_ROI_CLASSES = tuple(c.strip() for c in os.getenv("PLATE_ROI_CLASSES", "car,truck,bus,motorcycle,vehicle").split(",") if c.strip())
+PLATE_ROI_MARGIN = 0.1          # 차량 박스를 가로/세로 이 비율만큼 넓혀서 자름 (번호판이 박스 경계에 걸리는 경우 대비)
+PLATE_ROI_IMGSZ = int(os.getenv("PLATE_ROI_IMGSZ", "320"))                    # 차량 크롭 탐지 입력 크기
+PLATE_FALLBACK_MAX_SIDE = int(os.getenv("PLATE_FALLBACK_MAX_SIDE", "960"))    # 전체 프레임 탐지 시 긴 변 최대 길이
+# 조기 종료 투표: 앞쪽 프레임만으로 번호판이 확실하면 나머지 프레임은 디코딩/OCR 생략
+PLATE_EARLY_STOP = os.getenv("PLATE_EARLY_STOP", "true").lower() == "true"
+PLATE_VOTE_CHUNK = 5            # 몇 프레임마다 중간 투표를 할지
+PLATE_VOTE_MARGIN = 2           # 1위 번호가 2위보다 이만큼 더 득표해야 확정
+PLATE_MIN_MEAN_CONF = 0.6       # 1위 번호의 평균 OCR 확신도 하한
+
+# 디코딩 / 전처리 / 추론 스레드 파이프라인 설정
+PIPELINE_THREADED = os.getenv("PIPELINE_THREADED", "true").lower() == "true"
+PIPELINE_PREPROCESS_WORKERS = int(os.getenv("PIPELINE_PREPROCESS_WORKERS", "2"))  # 리사이즈 스레드 수
+PIPELINE_QUEUE_DEPTH = int(os.getenv("PIPELINE_QUEUE_DEPTH", "8"))                # 단계 사이 큐 크기 (백프레셔)
+
+# 분석 워커 프로세스 풀 설정
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))          # 0이면 서버 프로세스 안의 스레드 1개로 처리
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", "8"))  # 실행 중 + 대기 작업 상한 (초과 시 503)
+
+# 비동기 분석 작업(job) API
+JOB_PROGRESS_EVERY = 30         # 디코딩 진행 상황을 몇 프레임마다 보고할지
+JOB_TTL_SEC = int(os.getenv("JOB_TTL_SEC", "3600"))        # 끝난 작업 결과 보관 시간
+JOB_MAX_KEEP = int(os.getenv("JOB_MAX_KEEP", "500"))       # 보관할 최대 작업 수 (오래된 완료 작업부터 정리)
+JOB_SSE_INTERVAL = 0.5          # SSE 스트림이 새 이벤트를 확인하는 간격(초)
+
+# 업로드 수신: 고정 크기 청크로 디스크에 비동기 기록 (영상 전체를 메모리에 올리지 않음)
+UPLOAD_CHUNK_SIZE = 1024 * 1024                                       # 한 번에 읽고 쓰는 크기 (1MB)
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 ** 3)))  # 업로드 최대 크기 (0이면 제한 없음)
+
+# 웹 업로드 영상 로컬 캐시: 분석 워커가 S3에서 같은 영상을 다시 내려받지 않도록 디스크에 보관 (sha256 파일명)
+VIDEO_CACHE_ENABLED = os.getenv("VIDEO_CACHE_ENABLED", "true").lower() == "true"
+VIDEO_CACHE_DIR = os.path.join(TEMP_VIDEO_DIR, "cache")
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(10 * 1024 ** 3)))  # 캐시 디스크 용량 상한
+VIDEO_CACHE_GRACE_SEC = 900     # 최근 이 시간 안에 쓰인 영상은 분석/업로드 중일 수 있어 삭제하지 않음
+
+# 긴 영상 구간 분할 분석: 프레임 범위를 (SEQUENCE_LENGTH - STEP_SIZE)만큼 겹치는 구간으로 나눠 프로세스별로 디코딩/분류
+# (분석 워커 1개당 이만큼 프로세스를 더 띄우므로 ANALYSIS_WORKERS x ANALYSIS_CHUNK_WORKERS가 코어 수를 넘지 않게 설정)
+ANALYSIS_CHUNK_WORKERS = int(os.getenv("ANALYSIS_CHUNK_WORKERS", "0"))        # 0이면 사용 안 함 (순차 분석)
+ANALYSIS_CHUNK_MIN_FRAMES = int(os.getenv("ANALYSIS_CHUNK_MIN_FRAMES", "1800"))  # 이보다 짧은 영상은 순차 분석
+ANALYSIS_CHUNKS_PER_WORKER = 2  # 워커당 구간 수 (구간마다 디코딩 속도가 달라도 놀고 있는 프로세스가 없게)
+
 # --- [AWS S3 설정] ---
 # .env에 적힌 변수명과 일치시켜야 합니다.
 BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "human-final-project-bucket")
@@ -28,8 +142,22 @@ AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION", "ap-southeast-2")
 
-# S3 Config 설정
-S3_CONFIG = Config(region_name=AWS_REGION, signature_version='s3v4')
+# S3 전송 설정: 큰 영상은 멀티파트로 나눠 여러 스레드가 동시에 업로드/다운로드
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024                                          # 이보다 크면 멀티파트
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(16 * 1024 * 1024)))  # 파트 크기
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "10"))                    # 전송 1건당 동시 파트 수
+# S3 웹훅 영상을 내려받지 않고 presigned URL로 바로 디코딩 (FFmpeg가 Range 요청으로 필요한 부분만 읽음)
+S3_STREAM_READ = os.getenv("S3_STREAM_READ", "true").lower() == "true"
+S3_STREAM_URL_EXPIRES = 3 * 3600  # 스트리밍 분석용 URL 유효 시간 (분석 도중 만료되지 않게 넉넉히)
+
+# 미리보기(presigned) URL 캐시: 같은 객체는 만료 직전까지 서명한 URL을 재사용 (/api/logs 폴링 시 매번 서명하지 않음)
+PRESIGN_EXPIRES = 3600                                               # URL 유효 시간(초)
+PRESIGN_REFRESH_MARGIN = int(os.getenv("PRESIGN_REFRESH_MARGIN", "600"))  # 만료 이 시간 전부터는 새로 서명
+PRESIGN_CACHE_SIZE = int(os.getenv("PRESIGN_CACHE_SIZE", "10000"))     # 보관할 최대 URL 수 (LRU)
+
+# S3 Config 설정 (여러 전송이 동시에 돌아도 연결이 모자라지 않게 풀 크기를 늘림)
+S3_CONFIG = Config(region_name=AWS_REGION, signature_version='s3v4',
+                   max_pool_connections=max(10, S3_MAX_CONCURRENCY * 2))
 
 # --- [자바 서버 연동 설정] ---
 USE_JAVA_SYNC = True
@@ -1,9 +1,7 @@
 import os
-import shutil
-import requests
-from datetime import datetime
+import asyncio
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from starlette.middleware.sessions import SessionMiddleware 
 from fastapi.middleware.cors import CORSMiddleware 
 from pydantic import BaseModel
@@ -14,13 +12,20 @@ from app.routers import traffic, auth
 # 서비스 모듈 안전하게 임포트
 try:
     from app.services.s3_service import s3_manager
-    from app.services.ai_service import ai_manager
     from app.services.llm_service import get_llm_manager # ★ 추가됨: AI 초안 생성기
+    from app.services.analysis_worker import analysis_pool, QueueFullError
+    from app.services.analysis_jobs import job_store, run_analysis_chain
+    from app.services.upload_ingest import ingest_upload, UploadTooLargeError
 except ImportError:
     s3_manager = None
-    ai_manager = None
     get_llm_manager = None
-    print("❌ [오류] 서비스 모듈(s3_service, ai_service, llm_service)을 찾을 수 없습니다.")
+    analysis_pool = None
+    QueueFullError = None
+    job_store = None
+    run_analysis_chain = None
+    ingest_upload = None
+    UploadTooLargeError = None
+    print("❌ [오류] 서비스 모듈(s3_service, analysis_worker, llm_service)을 찾을 수 없습니다.")
 
 app = FastAPI(title="AI 교통관제 시스템")
 
@@ -51,16 +56,31 @@ app.include_router(auth.router)
 TEMP_DIR = "temp_videos"
 os.makedirs(TEMP_DIR, exist_ok=True)
 
-# 자바 서버 주소
-JAVA_SERVER_URL = "http://backend:8080/api/violations"
+# 실행 중인 작업 태스크 참조 (이벤트 루프는 약한 참조만 가지므로 끝날 때까지 보관)
+_job_tasks = set()
+
+@app.on_event("startup")
+def start_analysis_pool():
+    # 분석 워커 프로세스를 미리 띄워 모델을 로드해 둠
+    if analysis_pool:
+        analysis_pool.start()
+
+@app.on_event("shutdown")
+def stop_analysis_pool():
+    if analysis_pool:
+        analysis_pool.shutdown()
 
 @app.get("/")
 def read_root():
-    ocr_status = "✅ 로드됨" if (ai_manager and ai_manager.lpr_system) else "❌ 로드 안됨"
+    # 모델은 분석 워커에만 로드되어 있으므로 워커 예열 결과로 상태 확인
+    workers = analysis_pool.worker_status() if analysis_pool else {}
+    ocr_status = "✅ 로드됨" if workers.get("ocr") else ("⏳ 로드 중" if workers.get("loading") else "❌ 로드 안됨")
     return {
         "status": "running", 
         "message": "AI 관제 시스템 가동 중", 
-        "ocr_module": ocr_status
+        "ocr_module": ocr_status,
+        "analysis_pool": analysis_pool.stats() if analysis_pool else None,
+        "presign_cache": s3_manager.presign_cache_stats() if s3_manager else None
     }
 
 # ★ 백그라운드 작업 함수 (통합됨)
@@ -89,98 +109,38 @@ async def analyze_video_endpoint(
     file: UploadFile = File(...),
     serial_no: str = Form(...) # 프론트에서 보낸 serial_no 받기
 ):
-    if ai_manager is None:
+    if analysis_pool is None:
         return JSONResponse(content={"result": "AI 모듈 로드 실패", "plate": "Error"}, status_code=500)
 
-    # 1. 파일 저장
-    filename = file.filename
-    file_path = os.path.join(TEMP_DIR, filename)
-    
+    # 분석 대기열이 가득 차 있으면 파일을 받기 전에 바로 거절
+    if analysis_pool.is_full():
+        return JSONResponse(content={"result": "분석 대기열 초과", "plate": "-"}, status_code=503)
+
+    # 1. 파일 저장 (청크 단위 비동기 기록)
+    try:
+        upload = await ingest_upload(file, TEMP_DIR)
+    except UploadTooLargeError as e:
+        return JSONResponse(content={"result": "업로드 용량 초과", "plate": "-", "description": str(e)}, status_code=413)
+    filename, file_path = upload.filename, upload.path
+
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
         # 폴더명 결정 (없으면 WEB_UPLOAD)
         folder_name = serial_no if serial_no else "WEB_UPLOAD"
         print(f"📥 [Main] 영상 수신: {filename} (저장 폴더: {folder_name})")
 
-        # 2. AI 분석 실행
-        print("🔄 AI 분석 엔진 가동 (YOLO + TF)...")
-        result = ai_manager.analyze_local_video(file_path)
-        
-        # 3. S3 경로(Key) 생성
-        s3_key = f"raspberrypi_video/{folder_name}/{filename}"
-        
-        if s3_manager:
-            # 미리보기 URL 생성
-            result["video_url"] = s3_manager.get_presigned_url(s3_key)
-        
-        print(f"✅ [Main] 분석 완료: {result['result']}")
-
-        # =========================================================
-        # ★ [추가됨] 4. AI 신고 초안 생성 및 데이터 정제
-        # =========================================================
-        llm_manager = get_llm_manager()
-        ai_draft_text = ""
-        violation_type = result.get("result", "")
-        
-        # 위반 사항이 있을 때만 초안 생성
-        if "정상" not in violation_type and "에러" not in violation_type and llm_manager:
-            print(f"📝 [Main] 신고 초안 생성 요청 중... ({violation_type})")
-            
-            draft_prompt = f"""
-            다음 위반 사실을 바탕으로 안전신문고 신고 내용을 "상세 내용" 칸에 들어갈 말투로 작성해줘.
-            - 위반 일시: {result.get("time", "")}
-            - 위반 장소: {result.get("location", "")}
-            - 위반 항목: {violation_type}
-            - 차량 번호: {result.get("plate", "")}
-            """
-            ai_draft_text = llm_manager.get_report_draft(draft_prompt)
-            print(f"✅ [Main] 초안 생성 완료: {ai_draft_text[:20]}...")
-        else:
-            ai_draft_text = "위반 사항 없음" if "정상" in violation_type else "분석 실패"
-
-        # 날짜/시간 분리 (Java DTO 포맷용)
-        time_str = result.get("time", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        try:
-            dt = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
-            incident_date = dt.strftime('%Y-%m-%d')
-            incident_time = dt.strftime('%H:%M:%S')
-        except:
-            incident_date = time_str
-            incident_time = ""
-
-        # =========================================================
-        # 5. 자바 서버로 결과 전송 (DB 저장용)
-        # =========================================================
+        # 2. 분석 -> 초안 생성 -> 자바 서버 저장 (analysis_jobs.run_analysis_chain)
         try:
-            # 자바 DTO(IncidentLogDTO) 필드명에 정확히 맞춘 Payload 생성
-            java_payload = {
-                "serialNo": folder_name,
-                "videoUrl": result.get("video_url", ""),
-                "incidentDate": incident_date,
-                "incidentTime": incident_time,
-                "violationType": violation_type,
-                "plateNo": result.get("plate", "-"),
-                "location": result.get("location", ""),
-                "aiDraft": ai_draft_text  # ★ 핵심: 초안 데이터 포함
-            }
-            
-            print(f"🚀 [Main] 자바 서버로 데이터 전송 시도: {JAVA_SERVER_URL}")
-            response = requests.post(JAVA_SERVER_URL, json=java_payload, timeout=5)
-            
-            if response.status_code == 200:
-                print("✅ [Main] 자바 서버 DB 저장 성공!")
-            else:
-                print(f"⚠️ [Main] 자바 서버 응답 오류: {response.status_code} - {response.text}")
-        except Exception as e:
-            print(f"❌ [Main] 자바 서버 연결 실패 (DB 저장 안됨): {e}")
-
-        # 6. S3 업로드는 백그라운드로 넘김
+            result, s3_key = await run_analysis_chain(file_path, filename, folder_name)
+        except QueueFullError as e:
+            print(f"⚠️ [Main] {e}")
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            return JSONResponse(content={"result": "분석 대기열 초과", "plate": "-"}, status_code=503)
+
+        # 3. S3 업로드는 백그라운드로 넘김
         background_tasks.add_task(background_s3_upload, file_path, s3_key)
 
-        # 7. 프론트엔드에 결과 반환 (aiDraft 포함)
-        result["aiDraft"] = ai_draft_text
+        # 4. 프론트엔드에 결과 반환 (aiDraft 포함)
         return JSONResponse(content=result)
 
     except Exception as e:
@@ -195,6 +155,67 @@ async def analyze_video_endpoint(
             "description": str(e)
         }, status_code=500)
 
+# =========================================================
+# ★ 작업(job) 기반 분석 API: 요청은 바로 반환하고 진행 상황은 조회/SSE로 확인
+# =========================================================
+async def _run_job(job_id: str, file_path: str, filename: str, folder_name: str):
+    try:
+        result, s3_key = await run_analysis_chain(file_path, filename, folder_name, job_id=job_id)
+    except Exception as e:
+        print(f"❌ [Job {job_id[:8]}] 분석 실패: {e}")
+        job_store.fail(job_id, str(e))
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return
+    job_store.finish(job_id, result)
+    await asyncio.to_thread(background_s3_upload, file_path, s3_key)
+
+@app.post("/api/jobs", status_code=202)
+async def create_job_endpoint(
+    file: UploadFile = File(...),
+    serial_no: str = Form(...)
+):
+    if job_store is None:
+        return JSONResponse(content={"error": "AI 모듈 로드 실패"}, status_code=500)
+    if analysis_pool.is_full():
+        return JSONResponse(content={"error": "분석 대기열 초과"}, status_code=503)
+
+    try:
+        upload = await ingest_upload(file, TEMP_DIR)
+    except UploadTooLargeError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=413)
+    filename, file_path = upload.filename, upload.path
+    folder_name = serial_no if serial_no else "WEB_UPLOAD"
+
+    job = job_store.create(filename)
+    print(f"📥 [Job {job.job_id[:8]}] 영상 수신: {filename} (저장 폴더: {folder_name})")
+    task = asyncio.create_task(_run_job(job.job_id, file_path, filename, folder_name))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.job_id}",
+        "events_url": f"/api/jobs/{job.job_id}/events",
+    }
+
+@app.get("/api/jobs/{job_id}")
+def get_job_endpoint(job_id: str):
+    snapshot = job_store.snapshot(job_id) if job_store else None
+    if snapshot is None:
+        return JSONResponse(content={"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return snapshot
+
+@app.get("/api/jobs/{job_id}/events")
+def job_events_endpoint(job_id: str):
+    # 단계별 진행 상황 SSE 스트림 (queued, decoding, windows_scored, detection_done, ocr_done, draft_generated, synced, done)
+    if job_store is None or job_store.get(job_id) is None:
+        return JSONResponse(content={"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return StreamingResponse(
+        job_store.stream(job_id), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # 영상 삭제 요청 모델
 class DeleteVideoRequest(BaseModel):
     video_url: str
@@ -2,13 +2,16 @@ from fastapi import APIRouter, Request, BackgroundTasks, UploadFile, File
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 import os
+import asyncio
 import requests 
 
 from app.core.config import TEMP_VIDEO_DIR, BUCKET_NAME
 from app.core.global_state import detection_logs
 from app.services.s3_service import s3_manager
-from app.services.ai_service import ai_manager
 from app.services.llm_service import get_llm_manager
+from app.services.analysis_worker import analysis_pool, QueueFullError
+from app.services.upload_ingest import ingest_upload, UploadTooLargeError
+from app.services.video_cache import video_cache
 
 # AI가 만든 답변을 Java 서버에도 실시간으로 복사(동기화)
 USE_JAVA_SYNC = True 
@@ -38,37 +41,74 @@ async def index(request: Request):  # 비동기 처리 및 브라우저가 보
     # HTML 파일 안에서 파이썬의 접속 정보를 쓸수 있게 넘겨주기
     return templates.TemplateResponse("index.html", {"request": request})  
 
+async def background_s3_upload(local_path: str, s3_key: str):
+    """캐시에 있는 영상을 S3에 업로드 (파일은 캐시가 관리하므로 삭제하지 않음)"""
+    try:
+        print(f"☁️ [Background] S3 업로드 시작: {s3_key}")
+        await s3_manager.upload_file_async(local_path, s3_key)
+        print(f"✅ [Background] S3 업로드 완료")
+    except Exception as e:
+        print(f"❌ [Background] S3 업로드 실패: {e}")
+
 @router.post("/upload-video")
 # uploadFile = File(...): 사용자가 브라우저에서 선택한 영상 파일 객체
 # background_tasks : 비동기식 후행 처리로 요청 -> 작업 예약 -> 응답 -> 작업 수행 순서로 http 통신을 유지하지 않아도 별도의 스레드에서 이벤트 실행
-async def upload_video(file: UploadFile = File(...), background_tasks: BackgroundTasks = None):
+async def upload_video(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """로컬 영상을 S3에 업로드하고 분석을 시작하는 엔드포인트"""
+    # 분석 대기열이 가득 차 있으면 업로드 전에 바로 거절
+    if analysis_pool.is_full():
+        return JSONResponse(content={
+            "success": False,
+            "error": "분석 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요."
+        }, status_code=503)
+    temp_file = None
     try:
-        # 폴더 경로와 파일 이름을 합쳐 C:/temp/video.mp4 의 전체 경로가 temp_file에 할당
-        temp_file = os.path.join(TEMP_VIDEO_DIR, file.filename)
-        # wb(white binary)모드로 열어 이진 데이터로 변환 후 작업이 끝나면 파일 자동 닫기
-        with open(temp_file, "wb") as buffer:
-            buffer.write(await file.read()) # 비동기 방식으로 브라우저가 전송한 데이터를 끝까지 읽은 후 하드디스크에 기록
-        
-        # S3 업로드
-        s3_key = f"raspberrypi_video/{file.filename}"   # S3 버킷 안에서 파일이 저장될 폴더 경로
-        s3_manager.upload_file(temp_file, s3_key)       # 로컬에 저장한 temp_file을 AWS S3로 전송
+        # 브라우저가 보낸 영상을 1MB씩 읽어 임시 폴더에 기록 (전체를 메모리에 올리지 않음, sha256은 기록하면서 계산)
+        upload = await ingest_upload(file, TEMP_VIDEO_DIR)
+        temp_file = upload.path
         
-        # 백그라운드에서 AI 분석 시작
-        if background_tasks:        #
-            background_tasks.add_task(ai_manager.process_video_task, s3_key)
+        s3_key = f"raspberrypi_video/{upload.filename}"  # S3 버킷 안에서 파일이 저장될 폴더 경로
         
-        # 임시 파일 삭제
-        if os.path.exists(temp_file):  # temp_file이 남아있는지 확인 후 임시 파일 삭제.
-            os.remove(temp_file)       # AWS S3에 이미 업로드 되어 상관 없음
+        if video_cache.enabled:
+            # 로컬 캐시에 넣어 두면 분석 워커가 S3에서 다시 내려받지 않음
+            cached_file = await asyncio.to_thread(video_cache.put, temp_file, upload.sha256, s3_key)
+            # 분석 워커 풀에 AI 분석 작업 등록 후, S3 업로드는 응답 뒤 분석과 동시에 진행
+            analysis_pool.submit_video_task(s3_key)
+            background_tasks.add_task(background_s3_upload, cached_file, s3_key)
+        else:
+            # S3 업로드
+            s3_manager.upload_file(temp_file, s3_key)       # 로컬에 저장한 temp_file을 AWS S3로 전송
+            
+            # 분석 워커 풀에 AI 분석 작업 등록 (응답은 바로 반환)
+            analysis_pool.submit_video_task(s3_key)
+            
+            # 임시 파일 삭제
+            if os.path.exists(temp_file):  # temp_file이 남아있는지 확인 후 임시 파일 삭제.
+                os.remove(temp_file)       # AWS S3에 이미 업로드 되어 상관 없음
         
         # React용 JSON 응답 반환
         return JSONResponse(content={
             "success": True,
             "message": "영상 업로드 및 분석이 시작되었습니다.",
-            "filename": file.filename,
-            "s3_key": s3_key
+            "filename": upload.filename,
+            "s3_key": s3_key,
+            "size": upload.size,
+            "sha256": upload.sha256
         }, status_code=200)
+    except UploadTooLargeError as e:
+        return JSONResponse(content={
+            "success": False,
+            "error": str(e)
+        }, status_code=413)
+    except QueueFullError as e:
+        # 대기열 확인 뒤 업로드하는 사이에 다른 요청이 자리를 채운 경우
+        print(f"⚠️ {e}")
+        if temp_file and os.path.exists(temp_file):
+            os.remove(temp_file)
+        return JSONResponse(content={
+            "success": False,
+            "error": "분석 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요."
+        }, status_code=503)
     except Exception as e:
         print(f"❌ 업로드 에러: {e}")
         return JSONResponse(content={
@@ -79,12 +119,11 @@ async def upload_video(file: UploadFile = File(...), background_tasks: Backgroun
 @router.get("/api/logs")
 async def get_logs():
     """AI 분석 로그 데이터를 브라우저 및 자바 서버에 반환"""
-    updated_logs = []
-    for log in detection_logs:
-        video_key = f"raspberrypi_video/{log['info']}"
-        # S3에서 영상 재생을 위한 미리보기 URL 생성
-        updated_logs.append({**log, "video_url": s3_manager.get_presigned_url(video_key)})
-    return updated_logs
+    logs = list(detection_logs)
+    video_keys = [f"raspberrypi_video/{log['info']}" for log in logs]
+    # S3에서 영상 재생을 위한 미리보기 URL (캐시된 URL 재사용, 만료가 가까운 것만 한 번에 새로 서명)
+    urls = s3_manager.get_presigned_urls(video_keys)
+    return [{**log, "video_url": urls[key]} for log, key in zip(logs, video_keys)]
 
 @router.post("/s3-webhook")
 async def s3_webhook(request: Request, background_tasks: BackgroundTasks):
@@ -102,8 +141,12 @@ async def s3_webhook(request: Request, background_tasks: BackgroundTasks):
         video_key = record['s3']['object']['key']
         if video_key.lower().endswith('.mp4'):
             print(f"🔔 S3 신호 수신: {video_key}")
-            # 비동기 방식으로 영상 분석 실행
-            background_tasks.add_task(ai_manager.process_video_task, video_key)
+            # 분석 워커 풀에 작업 등록 (대기열 초과 시 503 -> Lambda 재시도)
+            try:
+                analysis_pool.submit_video_task(video_key)
+            except QueueFullError as e:
+                print(f"⚠️ {e}")
+                return JSONResponse(content={"status": "busy", "reason": str(e)}, status_code=503)
             
     return {"status": "ok"}
 
@@ -1,18 +1,27 @@
 import os
 import cv2
 import numpy as np
-import tensorflow as tf
 import requests
 import urllib.parse
 from datetime import datetime
 from ultralytics import YOLO 
 from app.core.config import (
-    MODEL_PATH, YOLO_PATH, SEQUENCE_LENGTH, STEP_SIZE, 
+    YOLO_PATH, SEQUENCE_LENGTH, STEP_SIZE, 
     CATEGORIES, CSV_FILE, TEMP_VIDEO_DIR,
-    USE_JAVA_SYNC, JAVA_SERVER_URL
+    USE_JAVA_SYNC, JAVA_SERVER_URL,
+    TF_INPUT_SIZE, PIPELINE_THREADED,
+    MIN_CONFIDENCE, DETECTION_MODE, CLASSIFIER_BACKEND, MOTION_GATE_MODE,
+    AI_PRELOAD_MODELS, PLATE_ROI_MODE, ANALYSIS_CHUNK_WORKERS, JOB_PROGRESS_EVERY,
+    S3_STREAM_READ
 )
-from app.core.global_state import detection_logs
 from app.services.s3_service import s3_manager
+from app.services.video_cache import video_cache
+from app.services.inference_backend import load_classifier_backend
+from app.services.video_pipeline import (
+    StreamingWindowClassifier, BatchedObjectDetector, CandidateWindowKeeper,
+    ThreadedFramePipeline, iter_frames_serial, VideoFrameReader, MotionGate, read_frames, VideoOpenError
+)
+from app.services.chunked_analysis import ChunkedVideoAnalyzer, load_vehicle_detector
 from app.services.llm_service import get_llm_manager  # ★ 1. LLM 매니저 가져오기
 
 # 번호판 인식 모듈 (선택적 로드)
@@ -28,128 +37,328 @@ NEW_YOLO_PATH = os.path.join(base_dir, "models", "best.pt")
 processing_files = set()
 
 class AIService:
-    def __init__(self):
-        # 1. 위반 감지 모델 (TensorFlow - .h5)
-        print("⏳ TF 모델 로딩 중...")
+    def __init__(self, model=None, obj_detector=None, lpr_system=None, chunked=None):
+        # 인자로 구성요소를 넘기면 해당 모델은 로드하지 않고 그대로 사용 (벤치마크 스텁 주입용)
+        self.model = model if model is not None else self._load_classifier()
+        self.obj_detector = obj_detector if obj_detector is not None else self._load_obj_detector()
+        self.lpr_system = lpr_system if lpr_system is not None else self._load_lpr_system()
+        self.last_pipeline_report = None
+        # 긴 영상 구간 분할 분석기 (ANALYSIS_CHUNK_WORKERS > 0 일 때만, 프로세스 풀은 첫 사용 시 생성)
+        if chunked is None and ANALYSIS_CHUNK_WORKERS > 0:
+            chunked = ChunkedVideoAnalyzer(
+                detector_factory=load_vehicle_detector if DETECTION_MODE != "cascade" else None)
+        self.chunked = chunked
+
+    @staticmethod
+    def _load_classifier():
+        # 1. 위반 감지 모델 (keras .h5 / tflite / onnx 중 설정된 백엔드)
+        print(f"⏳ 위반 분류 모델 로딩 중... (backend: {CLASSIFIER_BACKEND})")
         try:
-            self.model = tf.keras.models.load_model(MODEL_PATH, compile=False)
-            print("✅ TF 모델 로드 완료")
+            model = load_classifier_backend()
+            print("✅ 위반 분류 모델 로드 완료")
+            return model
         except Exception as e:
-            print(f"❌ TF 모델 로드 실패: {e}")
-            self.model = None
-        
+            print(f"❌ 위반 분류 모델 로드 실패: {e}")
+            return None
+
+    @staticmethod
+    def _load_obj_detector():
         # 2. 학습된 YOLO 모델 로드 (.pt)
         print(f"⏳ YOLO 학습 모델 로딩 중: {NEW_YOLO_PATH}")
         try:
-            self.obj_detector = YOLO(NEW_YOLO_PATH)
+            obj_detector = YOLO(NEW_YOLO_PATH)
             print("✅ YOLO 객체 탐지 모델 로드 완료")
+            return obj_detector
         except Exception as e:
             print(f"❌ YOLO 로드 실패: {e}")
-            self.obj_detector = None
+            return None
 
+    @staticmethod
+    def _load_lpr_system():
         # 3. 번호판 인식기
         try:
             if PlateRecognizerModule:
-                self.lpr_system = PlateRecognizerModule(YOLO_PATH) 
+                lpr_system = PlateRecognizerModule(YOLO_PATH) 
                 print("✅ 번호판 인식 시스템 로드 완료")
-            else:
-                self.lpr_system = None
-                print("⚠️ 번호판 모듈 없음 (Import 실패)")
+                return lpr_system
+            print("⚠️ 번호판 모듈 없음 (Import 실패)")
         except Exception as e:
             print(f"❌ 번호판 모듈 초기화 실패: {e}")
-            self.lpr_system = None
+        return None
+
+    def _predict_windows(self, batch):
+        """(N, SEQUENCE_LENGTH, H, W, 3) float32 윈도우 배치 -> 클래스별 확률"""
+        return self.model.predict(batch)
+
+    @staticmethod
+    def _preprocess_frame(frame):
+        """TF 입력 크기로 리사이즈 (uint8 유지, 정규화는 배치 단위로 수행)"""
+        return cv2.resize(frame, TF_INPUT_SIZE)
 
-    def analyze_local_video(self, local_path):
-        """자바 서버에서 전달받은 로컬 파일을 직접 분석하는 메서드"""
+    def _vehicle_boxes(self, frames):
+        """번호판 ROI 탐지용: 구간 프레임별 차량 박스 (best.pt를 stride 간격으로 배치 실행)"""
+        if not (PLATE_ROI_MODE and self.obj_detector):
+            return None
+        detector = BatchedObjectDetector(self.obj_detector, keep_boxes=True)
+        for i, frame in enumerate(frames):
+            detector.push(i, frame)
+        detector.flush()
+        return detector.boxes_per_frame(len(frames))
+
+    def analyze_local_video(self, local_path, progress=None, raise_open_error=False):
+        """
+        자바 서버에서 전달받은 로컬 파일을 직접 분석하는 메서드
+        - progress(stage, **info): 단계별 진행 상황 콜백 (decoding / windows_scored / detection_done / ocr_done)
+        - raise_open_error: 영상을 열지 못하면 결과 대신 VideoOpenError (스트리밍 실패 시 다운로드로 대체하기 위함)
+        """
+        progress = progress or (lambda stage, **info: None)
         try:
-            filename = os.path.basename(local_path)
-            cap = cv2.VideoCapture(local_path)
-            all_frames = []
-            detected_items = set() 
+            # 긴 영상은 구간으로 나눠 프로세스별로 분류 (모션 게이트는 이전 프레임 상태에 의존하므로 순차 분석만 지원)
+            chunks = self.chunked.plan(local_path) if self.chunked and MOTION_GATE_MODE == "off" else None
+            if chunks:
+                return self._analyze_chunked(local_path, chunks, progress)
+
+            filename = os.path.basename(local_path.split("?")[0])  # 스트리밍 URL이면 서명 쿼리 제외
+            # 원본 FPS가 ANALYSIS_FPS보다 높으면 grab()으로 프레임을 건너뛰며 읽음
+            reader = VideoFrameReader(cv2.VideoCapture(local_path))
+            if raise_open_error and not reader.cap.isOpened():
+                reader.release()
+                raise VideoOpenError(filename)
+            # 전체 프레임을 쌓지 않고, 윈도우가 찰 때마다 바로 TF 예측 (메모리 일정)
+            classifier = StreamingWindowClassifier(self._predict_windows)
+            # YOLO는 N프레임 간격으로 샘플링해서 배치 추론
+            # (cascade 모드에서는 디코딩 중에는 돌리지 않고, 위반 판정 후 해당 구간에만 실행)
+            # (full 모드에서는 차량 박스도 후보 윈도우 구간만큼 보관해서 번호판 ROI 탐지에 재사용)
+            full_detection = self.obj_detector and DETECTION_MODE != "cascade"
+            detector = BatchedObjectDetector(self.obj_detector, keep_boxes=PLATE_ROI_MODE) if full_detection else None
+            # TF에 실제로 넣은 프레임의 분석 인덱스 (drop 모드에서는 정적 프레임이 빠지므로 따로 기록)
+            fed_indices = []
+
+            def window_indices(window_idx):
+                """윈도우를 이루는 프레임의 분석 인덱스"""
+                return fed_indices[window_idx * STEP_SIZE:window_idx * STEP_SIZE + SEQUENCE_LENGTH]
+
+            def box_ranges():
+                # 후보 윈도우 구간 + 아직 예측하지 않은 윈도우 구간(다음 윈도우 시작 프레임 이후)
+                ranges = [(idx[0], idx[-1] + 1) for idx in map(window_indices, keeper.ranked_windows())]
+                ranges.append((fed_indices[classifier.window_count * STEP_SIZE], float("inf")))
+                return ranges
+
+            # 번호판 인식용 원본 프레임은 상위 후보 윈도우 것만 보관 (메모리 상한을 넘는 해상도면 나중에 후보만 재디코딩)
+            keeper = CandidateWindowKeeper(loader=lambda w: read_frames(
+                local_path, fed_indices[w * STEP_SIZE:w * STEP_SIZE + SEQUENCE_LENGTH]))
+            # 정차/주차 구간 판별 (off가 아니면 정적 프레임은 탐지 생략)
+            gate = MotionGate() if MOTION_GATE_MODE in ("repeat", "drop") else None
+            last_active_small = None
+            # 디코딩 / 리사이즈 / 추론을 스레드로 분리 (큐로 연결, 백프레셔 적용)
+            if PIPELINE_THREADED:
+                pipeline = ThreadedFramePipeline(reader, self._preprocess_frame)
+                frames = pipeline
+            else:
+                pipeline = None
+                frames = iter_frames_serial(reader, self._preprocess_frame)
 
             print(f"🔄 AI 분석 엔진 가동 (YOLO + TF): {filename}")
 
-            while True:
-                ret, frame = cap.read()
-                if not ret: break
-
-                # 1. YOLO(.pt) 실시간 탐지
-                if self.obj_detector:
-                    # conf=0.4: 확신도 40% 이상만 감지
-                    results = self.obj_detector(frame, conf=0.4, verbose=False)
-                    for result in results:
-                        for box in result.boxes:
-                            # 클래스 ID를 이름으로 변환
-                            name = self.obj_detector.names[int(box.cls[0])]
-                            detected_items.add(name)
-
-                # 프레임 전처리 (TF 모델용)
-                # 모델 입력 크기(128x128)에 맞춰 리사이즈 및 정규화
-                all_frames.append(cv2.resize(frame, (128, 128)) / 255.0)
+            for frame_idx, frame, small_frame in frames:
+                # 0. 모션 게이트: 정적 프레임은 탐지를 건너뛰고, 윈도우에서는 대체(repeat) 또는 제외(drop)
+                active = gate.is_active(small_frame) if gate else True
+                if active:
+                    last_active_small = small_frame
+                elif MOTION_GATE_MODE == "drop":
+                    continue
+                else:
+                    small_frame = last_active_small
+
+                # 1. YOLO(.pt) 탐지 (배치가 차면 한 번에 추론)
+                if detector and active:
+                    detector.push(frame_idx, frame)
+
+                # 2. TF 윈도우 분류 (윈도우가 찰 때마다 예측)
+                tf_idx = len(fed_indices)
+                fed_indices.append(frame_idx)
+                keeper.push(tf_idx, frame)
+                scored = classifier.push(small_frame)
+                for window_idx, pred in scored:
+                    keeper.offer(window_idx, float(np.max(pred)))
+                if scored and detector and detector.keep_boxes:
+                    detector.retain_boxes(box_ranges())
+                if frame_idx % JOB_PROGRESS_EVERY == 0:
+                    progress("decoding", frames_decoded=frame_idx + 1, windows_scored=classifier.window_count)
             
-            cap.release()
+            reader.release()
+            if gate:
+                print(f"🅿️ 모션 게이트({MOTION_GATE_MODE}): 정적 프레임 {gate.static_frames}개 "
+                      f"({gate.static_ratio * 100:.1f}%)")
+            if detector:
+                detector.flush()
+            if pipeline:
+                report = self.last_pipeline_report = pipeline.report()
+                print(f"📊 파이프라인 사용률 (병목: {report['bottleneck']}): "
+                      f"decode={report['decode']['utilization']}, "
+                      f"preprocess={report['preprocess']['utilization']}, "
+                      f"inference={report['inference']['utilization']}")
 
             # 2. 위반 판단 (TensorFlow - .h5 모델)
-            if len(all_frames) < SEQUENCE_LENGTH:
+            if classifier.frame_count < SEQUENCE_LENGTH:
                 return {"result": "분석 불가(영상 짧음)", "prob": 0, "plate": "-"}
 
-            # 시퀀스 생성
-            windows = [all_frames[i : i + SEQUENCE_LENGTH] for i in range(0, len(all_frames) - SEQUENCE_LENGTH + 1, STEP_SIZE)]
-            
-            # 예측 수행
-            if not windows:
+            # 남은 윈도우 예측
+            for window_idx, pred in classifier.flush():
+                keeper.offer(window_idx, float(np.max(pred)))
+            if classifier.window_count == 0:
                  return {"result": "분석 불가(프레임 부족)", "prob": 0, "plate": "-"}
-                 
-            predictions = self.model.predict(np.array(windows), batch_size=2, verbose=0)
-            
-            # 최고 확률 구간 찾기
-            best_prob, best_class_idx, best_window_idx = 0, -1, -1
-            for i, pred in enumerate(predictions):
-                idx = np.argmax(pred)
-                if pred[idx] > best_prob:
-                    best_prob, best_class_idx, best_window_idx = pred[idx], idx, i
-
-            # =========================================================
-            # 🚀 정상 주행 필터링 (임계값 적용)
-            # =========================================================
-            MIN_CONFIDENCE = 0.5  # 50% 미만이면 위반 아님(정상)으로 간주
-
-            if best_prob < MIN_CONFIDENCE:
-                raw_label = "정상 주행"
-                best_window_idx = -1 # 정상 주행이므로 번호판 인식 스킵 유도
-            else:
-                raw_label = CATEGORIES[best_class_idx] if best_class_idx != -1 else "정상 주행"
+            progress("windows_scored", frames_decoded=classifier.frame_count, windows_scored=classifier.window_count,
+                     best_prob=round(float(classifier.best_prob) * 100, 2))
 
-            # 3. 결과 정리
-            obj_summary = ", ".join(list(detected_items)) if detected_items else "없음"
-            final_display_result = f"{raw_label}" # 위반명만 사용
+            # 위반 구간의 원본 영상 기준 위치 (재샘플링해도 원본 프레임 번호/시간으로 보고)
+            def segment_of(window_idx):
+                start_idx = fed_indices[window_idx * STEP_SIZE]
+                end_idx = fed_indices[window_idx * STEP_SIZE + SEQUENCE_LENGTH - 1]
+                return {
+                    "start_frame": reader.source_index(start_idx),
+                    "end_frame": reader.source_index(end_idx),
+                    "start_sec": round(reader.timestamp(start_idx), 2),
+                    "end_sec": round(reader.timestamp(end_idx), 2),
+                }
 
-            # 4. 번호판 인식 (위반이 감지된 경우에만 수행)
-            plate_text = "-"
-            if self.lpr_system and best_window_idx != -1:
-                # 위반 발생 구간의 프레임 인덱스 계산
-                start_frame = best_window_idx * STEP_SIZE
-                # 해당 구간 OCR 수행
-                plate_text = self.lpr_system.process_segment(local_path, start_frame, SEQUENCE_LENGTH) or "인식 불가"
+            def first_pass_boxes(window_idx):
+                return detector.boxes_for(window_indices(window_idx)) if detector and detector.keep_boxes else None
 
-            return {
-                "result": final_display_result, 
-                "plate": plate_text,
-                "location": "--", # GPS 연동 전 임시값
-                "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                "prob": round(float(best_prob * 100), 2),
-                "info": f"YOLO 감지: {obj_summary}",
-                "video_url": "" 
-            }
+            return self._finish_analysis(classifier.best_prob, classifier.best_class_idx,
+                                         classifier.best_window_idx, keeper, detector,
+                                         full_detection, segment_of, progress, first_pass_boxes)
 
+        except VideoOpenError:
+            raise
         except Exception as e:
             print(f"❌ 로컬 분석 에러: {e}")
             # import traceback
             # traceback.print_exc()
             return {"result": "에러 발생", "prob": 0, "plate": "Error"}
 
+    def _finish_analysis(self, best_prob, best_class_idx, best_window_idx, keeper, detector,
+                         full_detection, segment_of, progress, boxes_of=None):
+        """
+        분류가 끝난 뒤 공통 처리 (순차 / 구간 분할 분석 공용)
+        임계값 판정 -> cascade 탐지 -> 번호판 인식 -> 결과 dict
+        - keeper: 후보 윈도우 원본 프레임 (CandidateWindowKeeper)
+        - segment_of(window_idx): 윈도우의 원본 기준 구간 정보
+        - boxes_of(window_idx): 1차 탐지(full 모드)에서 보관한 윈도우 프레임별 차량 박스 (없으면 None -> 다시 탐지)
+        """
+        # =========================================================
+        # 🚀 정상 주행 필터링 (임계값 적용)
+        # =========================================================
+        if best_prob < MIN_CONFIDENCE:
+            raw_label = "정상 주행"
+            best_window_idx = -1 # 정상 주행이므로 번호판 인식 스킵 유도
+        else:
+            raw_label = CATEGORIES[best_class_idx] if best_class_idx != -1 else "정상 주행"
+
+        # cascade 모드: 위반으로 판정된 경우에만 최고 확률 구간 프레임에 대해 YOLO 실행
+        # (이때 차량 박스도 보관해서 번호판 ROI 탐지에 재사용)
+        roi_boxes = {}
+        if self.obj_detector and not full_detection and best_window_idx != -1:
+            detector = BatchedObjectDetector(self.obj_detector, keep_boxes=PLATE_ROI_MODE)
+            best_frames = keeper.frames_for(best_window_idx)
+            for i, frame in enumerate(best_frames):
+                detector.push(i, frame)
+            detector.flush()
+            roi_boxes[best_window_idx] = detector.boxes_per_frame(len(best_frames))
+        detected_items = detector.detected_items if detector else set()
+        progress("detection_done", objects=sorted(detected_items))
+
+        # 3. 결과 정리
+        obj_summary = ", ".join(list(detected_items)) if detected_items else "없음"
+        final_display_result = f"{raw_label}" # 위반명만 사용
+
+        # 4. 번호판 인식 (위반이 감지된 경우에만 수행)
+        plate_text = "-"
+        plates = []
+        if self.lpr_system and best_window_idx != -1:
+            # 1차 디코딩 때 보관해 둔 위반 구간 원본 프레임으로 바로 OCR 수행 (순차 분석이면 영상 재오픈/seek 없음)
+            # 번호판은 차량 박스 안에서만 탐지 (PLATE_ROI_MODE)
+            window_frames = keeper.frames_for(best_window_idx)
+            if best_window_idx not in roi_boxes:
+                boxes = boxes_of(best_window_idx) if boxes_of else None
+                roi_boxes[best_window_idx] = boxes if boxes is not None else self._vehicle_boxes(window_frames)
+            plate_info = self.lpr_system.process_frames_detailed(window_frames, roi_boxes[best_window_idx])
+            plate_text = plate_info["plate"] or "인식 불가"
+            plates = plate_info["plates"]
+
+        if best_window_idx != -1:
+            progress("ocr_done", plate=plate_text)
+        segment = segment_of(best_window_idx) if best_window_idx != -1 else None
+
+        return {
+            "result": final_display_result, 
+            "plate": plate_text,
+            "plates": [p["plate"] for p in plates], # 구간 내 여러 차량 번호판
+            "location": "--", # GPS 연동 전 임시값
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "prob": round(float(best_prob * 100), 2),
+            "info": f"YOLO 감지: {obj_summary}",
+            "segment": segment,
+            "video_url": "" 
+        }
+
+    def _analyze_chunked(self, local_path, chunks, progress):
+        """구간 분할 병렬 분류 후, 후보 윈도우만 다시 디코딩해서 공통 처리"""
+        filename = os.path.basename(local_path.split("?")[0])  # 스트리밍 URL이면 서명 쿼리 제외
+        print(f"🔄 AI 분석 엔진 가동 (구간 {len(chunks)}개 병렬): {filename}")
+        full_detection = self.obj_detector and DETECTION_MODE != "cascade"
+        merged = self.chunked.run(local_path, chunks, full_detection=bool(full_detection), progress=progress)
+        self.last_pipeline_report = None
+
+        if merged["frame_count"] < SEQUENCE_LENGTH:
+            return {"result": "분석 불가(영상 짧음)", "prob": 0, "plate": "-"}
+        if merged["window_count"] == 0:
+            return {"result": "분석 불가(프레임 부족)", "prob": 0, "plate": "-"}
+        progress("windows_scored", frames_decoded=merged["frame_count"], windows_scored=merged["window_count"],
+                 best_prob=round(float(merged["best_prob"]) * 100, 2))
+
+        # 순차 분석의 CandidateWindowKeeper와 같은 후보(확률 상위, 동점이면 앞 윈도우)만, 필요할 때 원본 프레임 디코딩
+        keeper = CandidateWindowKeeper(loader=lambda w: self.chunked.decode_window(local_path, w))
+        ranked = sorted(merged["window_probs"].items(), key=lambda kv: (-kv[1], kv[0]))[:keeper.top_k]
+        for window_idx, prob in ranked:
+            keeper.add(window_idx, prob, None)
+
+        detector = None
+        if full_detection:
+            # 구간 워커에서 탐지한 결과 (감지 클래스 이름 집합만 사용)
+            detector = BatchedObjectDetector(self.obj_detector)
+            detector.detected_items = merged["detected_items"]
+
+        source_indices = merged["source_indices"]
+        cap = cv2.VideoCapture(local_path)
+        source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+
+        def segment_of(window_idx):
+            start_idx = window_idx * STEP_SIZE
+            end_idx = min(start_idx + SEQUENCE_LENGTH, len(source_indices)) - 1
+            start_frame, end_frame = source_indices[start_idx], source_indices[end_idx]
+            return {
+                "start_frame": start_frame,
+                "end_frame": end_frame,
+                "start_sec": round(start_frame / source_fps, 2) if source_fps else 0.0,
+                "end_sec": round(end_frame / source_fps, 2) if source_fps else 0.0,
+            }
+
+        return self._finish_analysis(merged["best_prob"], merged["best_class_idx"], merged["best_window_idx"],
+                                     keeper, detector, full_detection, segment_of, progress)
+
+    @staticmethod
+    def _download(key, filename):
+        """S3 객체를 임시 폴더로 내려받고 로컬 경로 반환"""
+        local_path = os.path.join(TEMP_VIDEO_DIR, filename)
+        # 폴더가 없으면 생성
+        os.makedirs(TEMP_VIDEO_DIR, exist_ok=True)
+        s3_manager.download_file(key, local_path)
+        return local_path
+
     def process_video_task(self, video_key):
-        """S3 업로드 시 백그라운드 분석 태스크"""
+        """S3 업로드 시 백그라운드 분석 태스크 (분석 워커에서 실행, 결과 payload 반환)"""
         # URL 디코딩 (한글 파일명 처리)
         decoded_key = urllib.parse.unquote_plus(video_key)
         filename = os.path.basename(decoded_key)
@@ -158,15 +367,27 @@ class AIService:
         processing_files.add(filename)
 
         try:
-            local_path = os.path.join(TEMP_VIDEO_DIR, filename)
-            
-            # 폴더가 없으면 생성
-            os.makedirs(TEMP_VIDEO_DIR, exist_ok=True)
-            
-            s3_manager.download_file(decoded_key, local_path)
+            # 웹 업로드 영상은 로컬 캐시에 있으므로 S3에서 다시 받지 않음 (없을 때만 다운로드)
+            cached_path = video_cache.lookup(decoded_key)
+            streaming = not cached_path and S3_STREAM_READ
+            if cached_path:
+                local_path = cached_path
+                print(f"📦 로컬 캐시 사용 (S3 다운로드 생략): {filename}")
+            elif streaming:
+                # 다운로드를 기다리지 않고 presigned URL을 바로 디코딩 (첫 바이트부터 분석 시작)
+                local_path = s3_manager.get_stream_url(decoded_key)
+                print(f"🌊 S3 스트리밍 분석 (다운로드 생략): {filename}")
+            else:
+                local_path = self._download(decoded_key, filename)
             
             # 1. 영상 분석 수행
-            analysis_result = self.analyze_local_video(local_path)
+            try:
+                analysis_result = self.analyze_local_video(local_path, raise_open_error=streaming)
+            except VideoOpenError:
+                # OpenCV(FFmpeg)가 URL을 열지 못하는 빌드면 내려받아서 분석 (열기 실패는 첫 요청에서 바로 드러남)
+                print(f"⚠️ S3 스트리밍 열기 실패, 다운로드로 대체: {filename}")
+                local_path = self._download(decoded_key, filename)
+                analysis_result = self.analyze_local_video(local_path)
             video_url = s3_manager.get_presigned_url(decoded_key)
             
             # 날짜 및 시간 분리 (Java DTO 포맷 맞춤)
@@ -220,8 +441,6 @@ class AIService:
                 
                 "aiDraft": ai_description  # <--- ★ 상세 내용(초안) 추가됨!
             }
-            
-            detection_logs.append(payload)
 
             # 4. Java(Spring) 서버로 결과 전송
             if USE_JAVA_SYNC:
@@ -233,9 +452,12 @@ class AIService:
             
             print(f"✅ 분석 및 전송 완료: {violation_type}")
 
-            # 임시 파일 정리
-            if os.path.exists(local_path): 
+            # 임시 파일 정리 (캐시 파일은 용량 상한에 따라 캐시가 정리, 스트리밍은 파일 없음)
+            if not cached_path and os.path.exists(local_path): 
                 os.remove(local_path)
+
+            # detection_logs 추가는 서버 프로세스(analysis_worker)에서 수행
+            return payload
             
         except Exception as e:
             print(f"❌ 전체 프로세스 에러: {e}")
@@ -243,4 +465,7 @@ class AIService:
             if filename in processing_files: 
                 processing_files.remove(filename)
 
-ai_manager = AIService()
\ No newline at end of file
+# 분석 워커(ANALYSIS_WORKERS=0이면 서버 프로세스의 워커 스레드)에서 import 할 때 모델을 미리 로드
+# API 서버 모듈(main, routers)은 이 모듈을 import 하지 않으므로 서버 프로세스에 모델 사본이 생기지 않음
+# (벤치마크 등 스텁 주입 시에는 AI_PRELOAD_MODELS=false)
+ai_manager = AIService() if AI_PRELOAD_MODELS else None
\ No newline at end of file
@@ -0,0 +1,220 @@
+# 파일명: analysis_jobs.py
+
+import json
+import time
+import uuid
+import asyncio
+import threading
+import requests
+from collections import OrderedDict
+from datetime import datetime
+from app.core.config import JAVA_SERVER_URL, JOB_TTL_SEC, JOB_MAX_KEEP, JOB_SSE_INTERVAL
+from app.services.s3_service import s3_manager
+from app.services.llm_service import get_llm_manager
+from app.services.analysis_worker import analysis_pool
+
+# =====================================================================
+# 1. 분석 작업(job) 상태 저장소 (서버 프로세스 메모리)
+# =====================================================================
+class AnalysisJob:
+    def __init__(self, job_id: str, filename: str):
+        self.job_id = job_id
+        self.filename = filename
+        self.status = "queued"   # queued | running | done | failed
+        self.stage = "queued"
+        self.progress = {}       # 마지막으로 보고된 단계별 정보 (frames_decoded, windows_scored, plate ...)
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.events = []         # [{"seq", "stage", "ts", ...info}] - SSE로 흘려보낼 이벤트
+        self._seq = 0
+
+    def add_event(self, stage: str, info: dict):
+        self._seq += 1
+        event = {"seq": self._seq, "stage": stage, "ts": round(time.time(), 3), **info}
+        # 디코딩 진행은 자주 오므로 연속된 같은 단계는 마지막 것만 남김 (이벤트 목록이 영상 길이에 비례해 커지지 않게)
+        if self.events and self.events[-1]["stage"] == stage == "decoding":
+            self.events[-1] = event
+        else:
+            self.events.append(event)
+        self.stage = stage
+        self.progress.update(info)
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "created_at": datetime.fromtimestamp(self.created_at).strftime('%Y-%m-%d %H:%M:%S'),
+            "elapsed_sec": round(self.updated_at - self.created_at, 2),
+        }
+
+
+class JobStore:
+    """
+    작업 상태를 메모리에 보관. 워커 진행 상황 수신 스레드와 이벤트 루프가 함께 접근하므로 lock으로 보호
+    끝난 작업은 ttl_sec 뒤 또는 max_keep을 넘으면 오래된 것부터 정리
+    """
+    def __init__(self, ttl_sec: int = JOB_TTL_SEC, max_keep: int = JOB_MAX_KEEP):
+        self.ttl_sec = ttl_sec
+        self.max_keep = max_keep
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, filename: str) -> AnalysisJob:
+        job = AnalysisJob(uuid.uuid4().hex, filename)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+            job.add_event("queued", {})
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def update(self, job_id: str, stage: str, **info):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in ("done", "failed"):
+                return
+            job.status = "running"
+            job.add_event(stage, info)
+
+    def finish(self, job_id: str, result: dict):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.status, job.result = "done", result
+            job.add_event("done", {})
+
+    def fail(self, job_id: str, error: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.status, job.error = "failed", error
+            job.add_event("failed", {"error": error})
+
+    def events_after(self, job_id: str, seq: int):
+        """seq 이후 이벤트 목록과 작업 종료 여부"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return [], True
+            return [e for e in job.events if e["seq"] > seq], job.status in ("done", "failed")
+
+    def _prune(self):
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.status in ("done", "failed")]
+        for job in finished:
+            if now - job.updated_at > self.ttl_sec or len(self._jobs) >= self.max_keep:
+                del self._jobs[job.job_id]
+
+    async def stream(self, job_id: str):
+        """SSE(text/event-stream) 형식으로 진행 이벤트를 흘려보냄. 작업이 끝나면 최종 상태를 보내고 종료"""
+        seq = 0
+        while True:
+            events, finished = self.events_after(job_id, seq)
+            for event in events:
+                seq = event["seq"]
+                yield f"id: {seq}\nevent: {event['stage']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if finished:
+                snapshot = self.snapshot(job_id)
+                if snapshot:
+                    yield f"event: result\ndata: {json.dumps(snapshot, ensure_ascii=False, default=str)}\n\n"
+                return
+            await asyncio.sleep(JOB_SSE_INTERVAL)
+
+job_store = JobStore()
+# 워커 프로세스가 보낸 진행 상황(job_id, stage, info)을 작업 저장소로 연결
+analysis_pool.on_progress = lambda job_id, stage, info: job_store.update(job_id, stage, **info)
+
+# =====================================================================
+# 2. 분석 -> 미리보기 URL -> 신고 초안(LLM) -> 자바 서버 저장 체인
+# =====================================================================
+async def run_analysis_chain(file_path: str, filename: str, folder_name: str, job_id: str = None):
+    """
+    /api/analyze-video 와 /api/jobs 공용 처리. (결과 dict, S3 키) 반환
+    분석은 워커 풀에서, LLM 호출과 자바 서버 전송은 스레드에서 실행해 이벤트 루프를 막지 않음
+    (대기열이 가득 차면 QueueFullError가 그대로 올라감)
+    """
+    def progress(stage, **info):
+        if job_id:
+            job_store.update(job_id, stage, **info)
+
+    # 1. AI 분석 실행 (워커 프로세스에서 실행, 이벤트 루프는 대기만 함)
+    print("🔄 AI 분석 엔진 가동 (YOLO + TF)...")
+    result = await analysis_pool.analyze(file_path, job_id=job_id)
+
+    # 2. S3 경로(Key) 생성 + 미리보기 URL
+    s3_key = f"raspberrypi_video/{folder_name}/{filename}"
+    if s3_manager:
+        result["video_url"] = s3_manager.get_presigned_url(s3_key)
+    print(f"✅ [Main] 분석 완료: {result['result']}")
+
+    # 3. AI 신고 초안 생성 (위반 사항이 있을 때만)
+    llm_manager = get_llm_manager()
+    violation_type = result.get("result", "")
+    if "정상" not in violation_type and "에러" not in violation_type and llm_manager:
+        print(f"📝 [Main] 신고 초안 생성 요청 중... ({violation_type})")
+        draft_prompt = f"""
+        다음 위반 사실을 바탕으로 안전신문고 신고 내용을 "상세 내용" 칸에 들어갈 말투로 작성해줘.
+        - 위반 일시: {result.get("time", "")}
+        - 위반 장소: {result.get("location", "")}
+        - 위반 항목: {violation_type}
+        - 차량 번호: {result.get("plate", "")}
+        """
+        ai_draft_text = await asyncio.to_thread(llm_manager.get_report_draft, draft_prompt)
+        print(f"✅ [Main] 초안 생성 완료: {ai_draft_text[:20]}...")
+    else:
+        ai_draft_text = "위반 사항 없음" if "정상" in violation_type else "분석 실패"
+    progress("draft_generated")
+
+    # 날짜/시간 분리 (Java DTO 포맷용)
+    time_str = result.get("time", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    try:
+        dt = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S')
+        incident_date = dt.strftime('%Y-%m-%d')
+        incident_time = dt.strftime('%H:%M:%S')
+    except:
+        incident_date = time_str
+        incident_time = ""
+
+    # 4. 자바 서버로 결과 전송 (DB 저장용)
+    try:
+        # 자바 DTO(IncidentLogDTO) 필드명에 정확히 맞춘 Payload 생성
+        java_payload = {
+            "serialNo": folder_name,
+            "videoUrl": result.get("video_url", ""),
+            "incidentDate": incident_date,
+            "incidentTime": incident_time,
+            "violationType": violation_type,
+            "plateNo": result.get("plate", "-"),
+            "location": result.get("location", ""),
+            "aiDraft": ai_draft_text  # ★ 핵심: 초안 데이터 포함
+        }
+        print(f"🚀 [Main] 자바 서버로 데이터 전송 시도: {JAVA_SERVER_URL}")
+        response = await asyncio.to_thread(requests.post, JAVA_SERVER_URL, json=java_payload, timeout=5)
+        if response.status_code == 200:
+            print("✅ [Main] 자바 서버 DB 저장 성공!")
+        else:
+            print(f"⚠️ [Main] 자바 서버 응답 오류: {response.status_code} - {response.text}")
+    except Exception as e:
+        print(f"❌ [Main] 자바 서버 연결 실패 (DB 저장 안됨): {e}")
+    progress("synced")
+
+    result["aiDraft"] = ai_draft_text
+    return result, s3_key
@@ -0,0 +1,190 @@
+# 파일명: analysis_worker.py
+
+import asyncio
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from app.core.config import ANALYSIS_WORKERS, ANALYSIS_MAX_PENDING
+from app.core.global_state import detection_logs
+
+# =====================================================================
+# 1. 워커 프로세스에서 실행되는 함수들 (pickle 가능하도록 모듈 최상위에 정의)
+# =====================================================================
+_worker_ai = None
+_progress_queue = None
+
+def _init_worker(progress_queue=None):
+    """워커 프로세스 시작 시 1회 실행: TF / YOLO / OCR 모델을 프로세스마다 한 번만 로드"""
+    global _worker_ai, _progress_queue
+    from app.services.ai_service import ai_manager, AIService
+    _worker_ai = ai_manager or AIService()
+    _progress_queue = progress_queue
+
+def _warmup():
+    """모델 로드 결과 (서버 프로세스의 상태 확인용)"""
+    return {"classifier": _worker_ai.model is not None, "ocr": _worker_ai.lpr_system is not None}
+
+def _run_analyze(local_path, job_id=None):
+    progress = None
+    if job_id is not None and _progress_queue is not None:
+        # 진행 상황은 서버 프로세스로 (job_id, stage, info) 형태로 전달
+        def progress(stage, **info):
+            _progress_queue.put((job_id, stage, info))
+    return _worker_ai.analyze_local_video(local_path, progress=progress)
+
+def _run_video_task(video_key):
+    return _worker_ai.process_video_task(video_key)
+
+# =====================================================================
+# 2. 작업 큐 + 워커 풀
+# =====================================================================
+class QueueFullError(Exception):
+    """대기 작업이 상한을 넘어 더 이상 작업을 받을 수 없음 (HTTP 503)"""
+    pass
+
+
+class AnalysisWorkerPool:
+    """
+    영상 분석 전용 워커 풀.
+    - workers개의 프로세스가 각각 모델을 로드해 두고 작업 큐에서 영상을 꺼내 분석
+    - 실행 중 + 대기 작업이 max_pending을 넘으면 QueueFullError로 즉시 거절
+    - 이벤트 루프는 await만 하므로 분석 중에도 다른 요청을 처리할 수 있음
+    """
+    def __init__(self, workers: int = ANALYSIS_WORKERS, max_pending: int = ANALYSIS_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._progress_queue = None
+        self._progress_listener = None
+        self.on_progress = None  # (job_id, stage, info) -> None : 서버 프로세스에서 진행 상황을 받을 콜백
+        self._warmups = []  # 워커 예열 future (모델 로드 결과)
+        self._pending = 0
+        self._active_keys = set()  # S3 키 중복 분석 방지 (워커 프로세스 간 공유가 안 되므로 여기서 관리)
+        self.submitted = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def start(self):
+        """풀 생성 + 워커 예열(모델 로드). 서버 시작 시 1회 호출"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            if self.workers > 0:
+                # TF/torch가 로드된 프로세스를 fork 하면 불안정하므로 spawn 사용
+                ctx = multiprocessing.get_context("spawn")
+                self._progress_queue = ctx.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self._progress_queue,)
+                )
+            else:
+                self._progress_queue = queue.Queue()
+                self._executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker,
+                                                    initargs=(self._progress_queue,))
+            self._progress_listener = threading.Thread(target=self._listen_progress, args=(self._progress_queue,),
+                                                       name="analysis-progress", daemon=True)
+            self._progress_listener.start()
+        self._warmups = [self._executor.submit(_warmup) for _ in range(max(1, self.workers))]
+        print(f"✅ 분석 워커 풀 시작 (workers={self.workers}, max_pending={self.max_pending})")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            progress_queue, self._progress_queue = self._progress_queue, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if progress_queue is not None:
+            progress_queue.put(None)  # 진행 상황 수신 스레드 종료
+
+    def _listen_progress(self, progress_queue):
+        """워커들이 보낸 진행 상황을 서버 프로세스의 on_progress 콜백으로 전달"""
+        while True:
+            item = progress_queue.get()
+            if item is None:
+                return
+            if self.on_progress:
+                try:
+                    self.on_progress(*item)
+                except Exception as e:
+                    print(f"⚠️ [Worker] 진행 상황 처리 실패: {e}")
+
+    def worker_status(self):
+        """워커 예열(모델 로드) 상태. 서버 프로세스는 모델을 로드하지 않으므로 워커가 보고한 결과를 사용"""
+        done = [f.result() for f in self._warmups if f.done() and f.exception() is None]
+        return {
+            "loading": len(done) < len(self._warmups),
+            "classifier": bool(done) and all(r["classifier"] for r in done),
+            "ocr": bool(done) and all(r["ocr"] for r in done),
+        }
+
+    def is_full(self) -> bool:
+        with self._lock:
+            return self._pending >= self.max_pending
+
+    def submit(self, fn, *args):
+        """작업을 큐에 넣고 concurrent.futures.Future 반환. 큐가 가득 차면 QueueFullError"""
+        if self._executor is None:
+            self.start()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(f"분석 대기열이 가득 찼습니다 ({self._pending}/{self.max_pending})")
+            self._pending += 1
+            self.submitted += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+
+    async def analyze(self, local_path, job_id=None):
+        """
+        analyze_local_video를 워커에서 실행하고 결과를 기다림 (이벤트 루프 블로킹 없음)
+        job_id를 넘기면 분석 단계별 진행 상황이 on_progress로 전달됨
+        """
+        return await asyncio.wrap_future(self.submit(_run_analyze, local_path, job_id))
+
+    def submit_video_task(self, video_key):
+        """S3 영상 분석 작업 등록. 결과 payload는 이 프로세스의 detection_logs에 추가"""
+        with self._lock:
+            if video_key in self._active_keys:
+                return None
+            self._active_keys.add(video_key)
+        try:
+            future = self.submit(_run_video_task, video_key)
+        except QueueFullError:
+            with self._lock:
+                self._active_keys.discard(video_key)
+            raise
+
+        def _collect(f):
+            with self._lock:
+                self._active_keys.discard(video_key)
+            if not f.cancelled() and f.exception() is None and f.result():
+                detection_logs.append(f.result())
+            elif not f.cancelled() and f.exception() is not None:
+                print(f"❌ [Worker] 분석 작업 실패 ({video_key}): {f.exception()}")
+
+        future.add_done_callback(_collect)
+        return future
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "failed": self.failed,
+            }
+
+analysis_pool = AnalysisWorkerPool()
@@ -0,0 +1,180 @@
+# 파일명: chunked_analysis.py
+
+import os
+import math
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from app.core.config import (
+    BASE_DIR, SEQUENCE_LENGTH, STEP_SIZE, TF_INPUT_SIZE,
+    ANALYSIS_CHUNK_WORKERS, ANALYSIS_CHUNK_MIN_FRAMES, ANALYSIS_CHUNKS_PER_WORKER
+)
+from app.services.inference_backend import load_classifier_backend
+from app.services.video_pipeline import StreamingWindowClassifier, BatchedObjectDetector, VideoFrameReader, read_frames
+
+# =====================================================================
+# 1. 구간 워커 프로세스에서 실행되는 함수들 (pickle 가능하도록 모듈 최상위에 정의)
+# - ai_service를 import 하지 않음 (import 시점에 전체 모델을 로드하므로)
+# =====================================================================
+_chunk_model = None
+_chunk_detector = None
+
+def load_vehicle_detector():
+    """best.pt (차량/객체 탐지) 로드 - DETECTION_MODE=full 일 때만 구간 워커에서 사용"""
+    from ultralytics import YOLO
+    return YOLO(os.path.join(BASE_DIR, "models", "best.pt"))
+
+def _init_chunk_worker(classifier_factory, detector_factory):
+    """구간 워커 시작 시 1회: 분류 모델(+ 필요하면 best.pt)만 로드 (번호판/OCR 모델은 불필요)"""
+    global _chunk_model, _chunk_detector
+    _chunk_model = classifier_factory()
+    _chunk_detector = detector_factory() if detector_factory else None
+
+def _analyze_chunk(video_path, start, stop, full_detection):
+    """
+    분석 인덱스 [start, stop) 프레임을 디코딩해서 윈도우별 확률을 계산 (stop=None이면 영상 끝까지)
+    start는 STEP_SIZE의 배수라서 구간 안 윈도우 번호 + start // STEP_SIZE = 전체 윈도우 번호
+    겹치는 꼬리 구간(다음 구간 앞부분)은 분류에만 쓰고 객체 탐지는 하지 않음 (중복 방지)
+    """
+    reader = VideoFrameReader(cv2.VideoCapture(video_path), start=start)
+    classifier = StreamingWindowClassifier(_chunk_model.predict)
+    detector = BatchedObjectDetector(_chunk_detector) if full_detection and _chunk_detector else None
+    core_stop = stop - (SEQUENCE_LENGTH - STEP_SIZE) if stop is not None else None
+    first_window = start // STEP_SIZE
+
+    windows = []
+    idx = start
+    try:
+        while stop is None or idx < stop:
+            ret, frame = reader.read()
+            if not ret:
+                break
+            if detector and (core_stop is None or idx < core_stop):
+                detector.push(idx, frame)
+            for window_idx, pred in classifier.push(cv2.resize(frame, TF_INPUT_SIZE)):
+                windows.append((first_window + window_idx, np.asarray(pred, dtype=np.float32)))
+            idx += 1
+        for window_idx, pred in classifier.flush():
+            windows.append((first_window + window_idx, np.asarray(pred, dtype=np.float32)))
+        if detector:
+            detector.flush()
+    finally:
+        reader.release()
+
+    return {
+        "start": start,
+        "frames": idx - start,
+        "windows": windows,
+        "source_indices": reader.source_indices,
+        "detected_items": detector.detected_items if detector else set(),
+    }
+
+# =====================================================================
+# 2. 구간 분할 분석기
+# =====================================================================
+class ChunkedVideoAnalyzer:
+    """
+    긴 영상 한 개를 여러 프로세스가 나눠서 디코딩 + 분류.
+    - 구간 길이는 STEP_SIZE의 배수, 각 구간은 다음 구간과 SEQUENCE_LENGTH - STEP_SIZE 프레임 겹침
+      -> 모든 윈도우가 정확히 한 구간에서만 완성됨 (빠지거나 중복되는 윈도우 없음)
+    - 병합 시 전체 윈도우 번호 순서로 '더 클 때만 교체' 규칙을 적용하므로 최고 확률 구간은 순차 분석과 동일
+    - 번호판/OCR용 원본 프레임은 프로세스 간에 옮기지 않고, 병합 후 후보 윈도우만 다시 seek 해서 디코딩
+    """
+    def __init__(self, workers: int = ANALYSIS_CHUNK_WORKERS, min_frames: int = ANALYSIS_CHUNK_MIN_FRAMES,
+                 chunks_per_worker: int = ANALYSIS_CHUNKS_PER_WORKER,
+                 classifier_factory=load_classifier_backend, detector_factory=None):
+        self.workers = workers
+        self.min_frames = min_frames
+        self.chunks_per_worker = max(1, chunks_per_worker)
+        self.classifier_factory = classifier_factory
+        self.detector_factory = detector_factory
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # TF/torch가 로드된 프로세스를 fork 하면 불안정하므로 spawn 사용
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_chunk_worker,
+                    initargs=(self.classifier_factory, self.detector_factory),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def plan(self, video_path: str):
+        """
+        [(start, stop)] 구간 목록 (분석 인덱스 기준, 마지막 구간은 stop=None으로 영상 끝까지)
+        분할할 필요가 없으면 None
+        """
+        if self.workers <= 0:
+            return None
+        reader = VideoFrameReader(cv2.VideoCapture(video_path))
+        source_frames = int(reader.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        reader.release()
+        # 재샘플링 후 분석 프레임 수 (메타데이터 기준 추정치 - 마지막 구간이 영상 끝까지 읽으므로 오차는 무관)
+        ratio = reader.target_fps / reader.source_fps if reader.resampling else 1.0
+        total = int((source_frames - 1) * ratio + 1e-9) + 1 if source_frames > 0 else 0
+        if total < max(self.min_frames, 2 * SEQUENCE_LENGTH):
+            return None
+
+        windows = (total - SEQUENCE_LENGTH) // STEP_SIZE + 1
+        n_chunks = max(1, min(self.workers * self.chunks_per_worker, windows))
+        per_chunk = math.ceil(windows / n_chunks) * STEP_SIZE  # 구간당 담당 윈도우 시작 프레임 범위
+        chunks = []
+        for start in range(0, windows * STEP_SIZE, per_chunk):
+            stop = start + per_chunk + SEQUENCE_LENGTH - STEP_SIZE
+            chunks.append((start, stop))
+        chunks[-1] = (chunks[-1][0], None)
+        return chunks
+
+    def run(self, video_path: str, chunks, full_detection: bool = False, progress=None):
+        """
+        구간별로 병렬 분석 후 병합. progress(stage, **info)가 있으면 구간이 끝날 때마다 보고
+        반환: frame_count, window_count, best_prob, best_class_idx, best_window_idx,
+              window_probs({윈도우 번호: 최고 확률}), source_indices(분석 인덱스 -> 원본 프레임), detected_items
+        """
+        pool = self._pool()
+        futures = [pool.submit(_analyze_chunk, video_path, start, stop, full_detection) for start, stop in chunks]
+        results = []
+        for future in as_completed(futures):
+            results.append(future.result())
+            if progress:
+                progress("decoding", chunks_done=len(results), chunks=len(futures),
+                         frames_decoded=sum(r["frames"] for r in results))
+        results.sort(key=lambda r: r["start"])
+
+        merged = {
+            "frame_count": 0, "window_count": 0,
+            "best_prob": 0, "best_class_idx": -1, "best_window_idx": -1,
+            "window_probs": {}, "source_indices": [], "detected_items": set(),
+        }
+        for result in results:
+            merged["frame_count"] = max(merged["frame_count"], result["start"] + result["frames"])
+            merged["detected_items"] |= result["detected_items"]
+            # 원본 프레임 번호 매핑: 겹치는 부분은 앞 구간과 같은 값이므로 이어지는 부분만 추가
+            known = len(merged["source_indices"])
+            merged["source_indices"].extend(result["source_indices"][max(0, known - result["start"]):])
+            for window_idx, pred in result["windows"]:
+                # StreamingWindowClassifier와 같은 규칙: 앞 윈도우가 동점이면 우선
+                idx = int(np.argmax(pred))
+                if pred[idx] > merged["best_prob"]:
+                    merged["best_prob"], merged["best_class_idx"], merged["best_window_idx"] = pred[idx], idx, window_idx
+                merged["window_probs"][window_idx] = float(pred[idx])
+                merged["window_count"] += 1
+        return merged
+
+    @staticmethod
+    def decode_window(video_path: str, window_idx: int):
+        """윈도우 하나의 원본(풀해상도) 프레임만 seek 해서 디코딩 (번호판 인식 / cascade 탐지용)"""
+        start = window_idx * STEP_SIZE
+        return read_frames(video_path, list(range(start, start + SEQUENCE_LENGTH)))
@@ -0,0 +1,100 @@
+# 파일명: inference_backend.py
+
+import numpy as np
+from app.core.config import (
+    MODEL_PATH, TFLITE_MODEL_PATH, ONNX_MODEL_PATH,
+    CLASSIFIER_BACKEND, CLASSIFIER_THREADS, TF_PREDICT_BATCH
+)
+
+# =====================================================================
+# 위반 분류 모델 추론 백엔드
+# - 모든 백엔드는 predict(batch) 하나만 제공:
+#   (N, SEQUENCE_LENGTH, H, W, 3) float32 [0, 1] -> (N, num_classes) 확률
+# - tensorflow / onnxruntime 은 선택된 백엔드에서만 import (서버 기동 시간, 이미지 크기 절약)
+# =====================================================================
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, model_path: str = MODEL_PATH):
+        import tensorflow as tf
+        self.model = tf.keras.models.load_model(model_path, compile=False)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.model.predict(batch, batch_size=TF_PREDICT_BATCH, verbose=0)
+
+
+class TFLiteBackend:
+    """TFLite 모델 (float / int8 양자화 모두 지원, 입출력 양자화 파라미터로 자동 변환)"""
+    name = "tflite"
+
+    def __init__(self, model_path: str = TFLITE_MODEL_PATH, num_threads: int = CLASSIFIER_THREADS):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads or None)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+
+    def _resize(self, n: int):
+        # 배치 크기가 바뀔 때만 텐서 재할당
+        if n == self._batch_size:
+            return
+        shape = list(self._input['shape'])
+        shape[0] = n
+        self.interpreter.resize_tensor_input(self._input['index'], shape)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = n
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        self._resize(len(batch))
+        dtype = self._input['dtype']
+        if dtype in (np.int8, np.uint8):
+            scale, zero_point = self._input['quantization']
+            info = np.iinfo(dtype)
+            x = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+        else:
+            x = batch.astype(dtype, copy=False)
+        self.interpreter.set_tensor(self._input['index'], x)
+        self.interpreter.invoke()
+        out = self.interpreter.get_tensor(self._output['index'])
+        if self._output['dtype'] in (np.int8, np.uint8):
+            scale, zero_point = self._output['quantization']
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+
+class OnnxBackend:
+    """ONNX Runtime (CPU)"""
+    name = "onnx"
+
+    def __init__(self, model_path: str = ONNX_MODEL_PATH, num_threads: int = CLASSIFIER_THREADS):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        self._input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self._input_name: batch.astype(np.float32, copy=False)})[0]
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+def load_classifier_backend(kind: str = CLASSIFIER_BACKEND, model_path: str = None):
+    """설정(CLASSIFIER_BACKEND)에 맞는 추론 백엔드 생성"""
+    if kind not in BACKENDS:
+        raise ValueError(f"지원하지 않는 분류 모델 백엔드: {kind} (keras / tflite / onnx)")
+    backend_cls = BACKENDS[kind]
+    return backend_cls(model_path) if model_path else backend_cls()
@@ -5,9 +5,19 @@ import numpy as np
 import re
 import logging
 import os
-from collections import Counter
+import threading
+from collections import Counter, OrderedDict
 from PIL import Image, ImageDraw, ImageFont
 from ultralytics import YOLO
+from app.core.config import (
+    OCR_BATCH_SIZE, OCR_MODE, OCR_PRIMARY_ENGINE, OCR_CASCADE_MIN_CONF, PLATE_TRACK_IOU, PLATE_TRACK_MAX_MISSED,
+    PLATE_TRACK_MIN_HITS, PLATE_TRACK_TOP_K,
+    PLATE_QUALITY_SCORING, PLATE_SHARPNESS_HEIGHT, PLATE_SHARPNESS_REF, PLATE_ASPECT_RANGE, PLATE_SEGMENT_TOP_K,
+    PLATE_EARLY_STOP, PLATE_VOTE_CHUNK, PLATE_VOTE_MARGIN, PLATE_MIN_MEAN_CONF, PLATE_POSITIONAL_VOTING,
+    PREPROC_DENOISE, PREPROC_NOISE_LOW, PREPROC_NOISE_HIGH, PREPROC_SMALL_CROP_HEIGHT, PREPROC_BUFFER_SHAPES,
+    OCR_CACHE_ENABLED, OCR_CACHE_SIZE, OCR_CACHE_HASH_SIZE, OCR_CACHE_MAX_DISTANCE,
+    PLATE_ROI_MODE, PLATE_ROI_MARGIN, PLATE_ROI_IMGSZ, PLATE_FALLBACK_MAX_SIDE
+)
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
@@ -17,25 +27,105 @@ logger = logging.getLogger(__name__)
 # 1. 전처리 클래스 (EasyOCR 최적화)
 # =====================================================================
 class PlateImagePreprocessor:
+    """
+    그레이스케일 -> 2배 확대 -> CLAHE -> 노이즈 제거
+    - CLAHE 객체와 중간 배열(그레이/확대/CLAHE 결과)은 크롭 크기별로 만들어 두고 재사용
+      (스레드마다 따로 보관하므로 여러 스레드에서 같은 인스턴스를 써도 안전)
+    - 노이즈 제거는 프로필로 선택: none / bilateral / nlm_fast / nlm, auto면 크롭 크기와 노이즈 추정으로 결정
+    - 반환 배열은 매번 새로 할당 (배치 OCR에서 여러 결과를 동시에 들고 있으므로 버퍼를 돌려주지 않음)
+    """
+    PROFILES = ("none", "bilateral", "nlm_fast", "nlm")
+
+    # 노이즈 추정용 라플라시안 차분 커널 (Immerkaer, 1996)
+    _NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+    def __init__(self, denoise: str = PREPROC_DENOISE, noise_low: float = PREPROC_NOISE_LOW,
+                 noise_high: float = PREPROC_NOISE_HIGH, small_height: int = PREPROC_SMALL_CROP_HEIGHT,
+                 max_shapes: int = PREPROC_BUFFER_SHAPES):
+        if denoise != "auto" and denoise not in self.PROFILES:
+            raise ValueError(f"지원하지 않는 PREPROC_DENOISE: {denoise} (auto | {' | '.join(self.PROFILES)})")
+        self.denoise = denoise
+        self.noise_low = noise_low
+        self.noise_high = noise_high
+        self.small_height = small_height
+        self.max_shapes = max_shapes
+        self._local = threading.local()
+        # 프로필별 사용 횟수 (auto 모드 선택 분포 확인용)
+        self.stats = {name: 0 for name in self.PROFILES}
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, "clahe"):
+            state.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            state.buffers = OrderedDict()
+        return state
+
+    def _buffers(self, state, h: int, w: int):
+        """(h, w) 크롭용 중간 버퍼 (gray, enlarged, enhanced) - 오래 안 쓴 크기부터 정리"""
+        key = (h, w)
+        bufs = state.buffers.get(key)
+        if bufs is None:
+            bufs = (np.empty((h, w), np.uint8), np.empty((h * 2, w * 2), np.uint8),
+                    np.empty((h * 2, w * 2), np.uint8))
+            state.buffers[key] = bufs
+            if len(state.buffers) > self.max_shapes:
+                state.buffers.popitem(last=False)
+        else:
+            state.buffers.move_to_end(key)
+        return bufs
+
+    @classmethod
+    def estimate_noise(cls, gray: np.ndarray) -> float:
+        """가우시안 노이즈 표준편차 추정 (확대 전 원본 크기에서 계산하므로 저렴)"""
+        h, w = gray.shape[:2]
+        if h < 3 or w < 3:
+            return 0.0
+        response = cv2.filter2D(gray.astype(np.float32), -1, cls._NOISE_KERNEL)[1:-1, 1:-1]
+        return float(np.sqrt(np.pi / 2) * np.abs(response).sum() / (6.0 * (w - 2) * (h - 2)))
+
+    def choose_profile(self, gray: np.ndarray) -> str:
+        if self.denoise != "auto":
+            return self.denoise
+        sigma = self.estimate_noise(gray)
+        if sigma < self.noise_low:
+            return "none"
+        # 작고 노이즈가 심한 크롭만 NLM (작은 창), 나머지는 값싼 bilateral로 충분
+        if sigma >= self.noise_high and gray.shape[0] < self.small_height:
+            return "nlm_fast"
+        return "bilateral"
+
     @staticmethod
-    def preprocess_for_ocr(plate_image: np.ndarray) -> np.ndarray:
+    def _denoise(image: np.ndarray, profile: str) -> np.ndarray:
+        if profile == "none":
+            return image.copy()
+        if profile == "bilateral":
+            return cv2.bilateralFilter(image, 5, 50, 50)
+        if profile == "nlm_fast":
+            return cv2.fastNlMeansDenoising(image, h=10, templateWindowSize=5, searchWindowSize=11)
+        return cv2.fastNlMeansDenoising(image, h=10, templateWindowSize=7, searchWindowSize=21)
+
+    def preprocess_for_ocr(self, plate_image: np.ndarray, profile: str = None) -> np.ndarray:
+        """profile을 넘기면 설정(PREPROC_DENOISE) 대신 해당 프로필로 노이즈 제거 (벤치마크용)"""
+        state = self._state()
+        h, w = plate_image.shape[:2]
+        gray_buf, enlarged, enhanced = self._buffers(state, h, w)
+
         # Step 1: 그레이스케일 변환
         if len(plate_image.shape) == 3:
-            gray = cv2.cvtColor(plate_image, cv2.COLOR_BGR2GRAY)
+            gray = cv2.cvtColor(plate_image, cv2.COLOR_BGR2GRAY, dst=gray_buf)
         else:
             gray = plate_image
 
         # Step 2: 이미지 확대 (2배) - 작은 번호판 인식률 향상
-        enlarged = cv2.resize(gray, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
-        
+        cv2.resize(gray, (w * 2, h * 2), dst=enlarged, interpolation=cv2.INTER_CUBIC)
+
         # Step 3: 명암 개선 (CLAHE)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(enlarged)
-        
+        state.clahe.apply(enlarged, dst=enhanced)
+
         # Step 4: 노이즈 제거
-        denoised = cv2.fastNlMeansDenoising(enhanced, h=10, templateWindowSize=7, searchWindowSize=21)
-        
-        return denoised
+        profile = profile or self.choose_profile(gray)
+        self.stats[profile] += 1
+        return self._denoise(enhanced, profile)
 
 # =====================================================================
 # 2. 기울기 보정 클래스
@@ -79,9 +169,22 @@ class PlateDeskewer:
 # 3. 다중 엔진 OCR (Paddle + EasyOCR)
 # =====================================================================
 class MultiEngineOCR:
-    def __init__(self):
+    def __init__(self, engines: dict = None, mode: str = OCR_MODE, primary: str = OCR_PRIMARY_ENGINE,
+                 min_conf: float = OCR_CASCADE_MIN_CONF):
+        # engines를 넘기면 엔진 로드 없이 그대로 사용 ({'paddle': ..., 'easy': ...})
         self.engines = {}
-        self._initialize_engines()
+        if engines is not None:
+            self.engines.update(engines)
+        else:
+            self._initialize_engines()
+        if mode not in ("cascade", "all"):
+            raise ValueError(f"지원하지 않는 OCR_MODE: {mode} (cascade | all)")
+        self.mode = mode
+        self.min_conf = min_conf
+        # 주 엔진이 로드되지 않았으면 남은 엔진 중 첫 번째를 주 엔진으로 사용
+        self.order = sorted(self.engines, key=lambda name: name != primary)
+        # 캐스케이드 통계: 주 엔진 결과 채택 / 보조 엔진 호출(폴백) 횟수
+        self.stats = {"primary_accepted": 0, "fallback": 0}
     
     def _initialize_engines(self):
         # 1. PaddleOCR 시도
@@ -103,32 +206,73 @@ class MultiEngineOCR:
         except Exception as e:
             logger.error(f"❌ EasyOCR 로드 실패: {e}")
 
-    def recognize_with_all_engines(self, plate_image: np.ndarray):
-        results = {}
-        confidences = {}
-
-        # PaddleOCR
-        if 'paddle' in self.engines:
-            try:
+    def _run_engine(self, name: str, plate_image: np.ndarray):
+        """엔진 하나로 인식 -> (text, conf) 또는 None"""
+        try:
+            if name == 'paddle':
                 p_res = self.engines['paddle'].ocr(plate_image, cls=True)
                 if p_res and p_res[0]:
                     txts = [line[1][0] for line in p_res[0]]
                     confs = [line[1][1] for line in p_res[0]]
-                    results['paddle'] = "".join(txts)
-                    confidences['paddle'] = np.mean(confs)
-            except: pass
-
-        # EasyOCR
-        if 'easy' in self.engines:
-            try:
+                    return "".join(txts), np.mean(confs)
+            elif name == 'easy':
                 e_res = self.engines['easy'].readtext(plate_image)
                 if e_res:
                     txts = [res[1] for res in e_res]
                     confs = [res[2] for res in e_res]
-                    results['easy'] = "".join(txts)
-                    confidences['easy'] = np.mean(confs)
-            except: pass
+                    return "".join(txts), np.mean(confs)
+        except: pass
+        return None
+
+    def recognize_with_all_engines(self, plate_image: np.ndarray):
+        results = {}
+        confidences = {}
+
+        for name in ('paddle', 'easy'):
+            if name not in self.engines:
+                continue
+            res = self._run_engine(name, plate_image)
+            if res:
+                results[name], confidences[name] = res
+
+        return self._pick_best(results, confidences)
+
+    def _accepts(self, res) -> bool:
+        """주 엔진 결과를 보조 엔진 없이 채택해도 되는지 (확신도 + 번호판 형식)"""
+        if not res or res[1] < self.min_conf:
+            return False
+        normalized = OCRPostProcessor.postprocess_korean_plate(res[0])
+        return OCRPostProcessor.validate_plate_format(normalized)[0]
+
+    def _count(self, accepted: bool):
+        self.stats["primary_accepted" if accepted else "fallback"] += 1
 
+    @property
+    def fallback_rate(self) -> float:
+        total = self.stats["primary_accepted"] + self.stats["fallback"]
+        return self.stats["fallback"] / total if total else 0.0
+
+    def recognize(self, plate_image: np.ndarray):
+        """설정된 모드(cascade | all)로 번호판 이미지 한 장 인식"""
+        if self.mode == "all" or len(self.order) < 2:
+            return self.recognize_with_all_engines(plate_image)
+
+        primary, fallbacks = self.order[0], self.order[1:]
+        results, confidences = {}, {}
+        res = self._run_engine(primary, plate_image)
+        if res:
+            results[primary], confidences[primary] = res
+        accepted = self._accepts(res)
+        self._count(accepted)
+        if not accepted:
+            for name in fallbacks:
+                res = self._run_engine(name, plate_image)
+                if res:
+                    results[name], confidences[name] = res
+        return self._pick_best(results, confidences)
+
+    @staticmethod
+    def _pick_best(results: dict, confidences: dict):
         if results:
             best_engine = max(confidences.items(), key=lambda x: x[1])[0]
             return {
@@ -138,21 +282,128 @@ class MultiEngineOCR:
             }
         return {'text': '', 'engine': 'none', 'confidence': 0.0}
 
+    @staticmethod
+    def _pad_to_same_size(images):
+        """배치 입력용: 비율이 깨지지 않도록 리사이즈 대신 흰색 여백으로 크기를 맞춤"""
+        max_h = max(img.shape[0] for img in images)
+        max_w = max(img.shape[1] for img in images)
+        return [cv2.copyMakeBorder(img, 0, max_h - img.shape[0], 0, max_w - img.shape[1],
+                                   cv2.BORDER_CONSTANT, value=255) for img in images]
+
+    def _paddle_batch(self, images):
+        # 크롭 자체가 글자 영역이므로 검출(det) 없이 인식기만 실행
+        # ocr()은 바깥 리스트의 원소마다 인식기를 따로 돌리므로, 크롭 전체를 원소 하나([images])로 넘겨야 한 번에 배치 인식
+        # 결과: [[(t, c), (t, c), ...]] - res[0]이 크롭 순서대로의 (text, conf)
+        p_res = self.engines['paddle'].ocr([images], det=False, cls=True)
+        lines = p_res[0] if p_res else None
+        if not lines or len(lines) != len(images):
+            raise ValueError("PaddleOCR 배치 결과 개수 불일치")
+        return [line if line and line[0] else None for line in lines]
+
+    def _easy_batch(self, images):
+        e_results = self.engines['easy'].readtext_batched(self._pad_to_same_size(images),
+                                                          batch_size=len(images))
+        out = []
+        for e_res in e_results:
+            if e_res:
+                out.append(("".join(res[1] for res in e_res), np.mean([res[2] for res in e_res])))
+            else:
+                out.append(None)
+        return out
+
+    def recognize_batch(self, plate_images: list):
+        """
+        여러 장의 번호판 이미지를 엔진별로 한 번에(배치) 인식.
+        엔진 호출 오버헤드를 크롭 수만큼이 아니라 배치 수만큼만 부담함.
+        배치 호출이 실패한 엔진만 해당 크롭들을 장별 호출로 대체 (다른 엔진은 계속 배치)
+        """
+        if not plate_images:
+            return []
+        batch_fns = {'paddle': self._paddle_batch, 'easy': self._easy_batch}
+        cascade = self.mode == "cascade" and len(self.order) >= 2
+        per_engine = {}
+        # cascade 모드에서는 주 엔진으로 전체를 먼저 돌리고, 기준 미달인 크롭만 보조 엔진으로 재인식
+        pending = list(range(len(plate_images)))
+        for rank, name in enumerate(self.order):
+            if not pending:
+                break
+            try:
+                engine_results = batch_fns[name]([plate_images[i] for i in pending])
+            except Exception as e:
+                logger.warning(f"⚠️ {name} 배치 인식 실패, 장별 인식으로 대체: {e}")
+                engine_results = [self._run_engine(name, plate_images[i]) for i in pending]
+            per_engine[name] = dict(zip(pending, engine_results))
+            if cascade and rank == 0:
+                accepted = [self._accepts(res) for res in engine_results]
+                for ok in accepted:
+                    self._count(ok)
+                pending = [i for i, ok in zip(pending, accepted) if not ok]
+
+        outputs = []
+        for i in range(len(plate_images)):
+            results, confidences = {}, {}
+            for name, engine_results in per_engine.items():
+                if engine_results.get(i):
+                    results[name], confidences[name] = engine_results[i]
+            outputs.append(self._pick_best(results, confidences))
+        return outputs
+
 # =====================================================================
 # 4. 후처리 (정규화)
 # =====================================================================
 class OCRPostProcessor:
-    @staticmethod
-    def postprocess_korean_plate(text: str) -> str:
+    # 숫자 자리에서만 적용하는 오인식 문자 교정 (한글 자리에는 적용하지 않음)
+    DIGIT_CORRECTIONS = {'O': '0', 'I': '1', 'S': '5', 'l': '1', 'Z': '2', 'B': '8', 'G': '9', 'A': '4', 'T': '1', 'o': '0'}
+    # 한글을 읽지 못한 자리 표시 (자리별 투표에서 다른 프레임 결과로 채움)
+    UNKNOWN = '?'
+
+    @classmethod
+    def _digits(cls, text: str) -> str:
+        return "".join(c for c in (cls.DIGIT_CORRECTIONS.get(ch, ch) for ch in text) if c.isdigit())
+
+    @classmethod
+    def decode_korean_plate(cls, text: str):
+        """
+        번호판 형식(앞 2~3자리 숫자 + 한글 1자 + 뒤 4자리 숫자)에 맞춰 자리별로 해석 -> (앞자리, 한글, 뒷자리) 또는 None
+        - 숫자 교정은 숫자 자리에만 적용
+        - 지역명(예: 서울12가3456)은 버리고 마지막 한글을 용도 기호로 사용
+        - 한글을 못 읽고 그 자리에 영문 등이 찍힌 경우 한글 자리를 UNKNOWN으로 남김
+        """
+        if not text: return None
+        text = re.sub(r'[\s\-.]', '', text)
+        hangul_positions = [i for i, c in enumerate(text) if '가' <= c <= '힣']
+        if hangul_positions:
+            i = hangul_positions[-1]
+            head, hangul, tail = cls._digits(text[:i]), text[i], cls._digits(text[i + 1:])
+        else:
+            chars = [c for c in text if c.isalnum()]
+            # 뒤 4자리 바로 앞 글자가 숫자면 한글이 통째로 빠진 것이라 자리를 맞출 수 없음
+            if len(chars) < 7 or chars[-5].isdigit():
+                return None
+            head, hangul, tail = cls._digits("".join(chars[:-5])), cls.UNKNOWN, cls._digits("".join(chars[-4:]))
+        if len(head) not in (2, 3) or len(tail) != 4:
+            return None
+        return head, hangul, tail
+
+    @classmethod
+    def region_prefix(cls, text: str, slots) -> str:
+        """용도 기호 앞의 지역명(구형 번호판, 예: 서울12가3456 -> 서울). 없거나 한글 자리를 못 읽었으면 ''"""
+        if not text or not slots or slots[1] == cls.UNKNOWN:
+            return ''
+        return re.sub(r'[^가-힣]', '', text[:text.rfind(slots[1])])
+
+    @classmethod
+    def postprocess_korean_plate(cls, text: str) -> str:
         if not text: return ''
+        slots = cls.decode_korean_plate(text)
+        if slots and slots[1] != cls.UNKNOWN:
+            # 지역명(구형 번호판)은 표기용으로 앞에 그대로 붙여 둠
+            return cls.region_prefix(text, slots) + "".join(slots)
+
+        # 형식에 맞지 않으면 전체 교정 후 한글, 숫자만 남김
         text = text.replace(' ', '').replace('-', '').replace('.', '')
-        
-        # 오인식 문자 교정
-        corrections = {'O': '0', 'I': '1', 'S': '5', 'l': '1', 'Z': '2', 'B': '8', 'G': '9', 'A': '4', 'T': '1', 'o': '0'}
-        for wrong, correct in corrections.items():
+        for wrong, correct in cls.DIGIT_CORRECTIONS.items():
             text = text.replace(wrong, correct)
-            
-        # 한글, 숫자만 남김
         text = re.sub(r'[^가-힣0-9]', '', text)
         return text
     
@@ -165,42 +416,376 @@ class OCRPostProcessor:
         return True, "유효함"
 
 # =====================================================================
-# 5. 통합 OCR 파이프라인
+# 5. OCR 결과 캐시 (지각 해시 기반)
+# =====================================================================
+class PlateOCRCache:
+    """
+    번호판 크롭의 dHash(인접 픽셀 밝기 비교 비트열)를 키로 OCR 결과를 보관하는 LRU 캐시.
+    연속 프레임이나 같은 영상 재업로드로 생기는 거의 같은 크롭은 해밍 거리 max_distance 이하면 적중 처리
+    적중 결과에는 'cached': True를 달아서 돌려줌 (OCR 엔진 호출 수 집계에서 제외하기 위함)
+    """
+    def __init__(self, max_entries: int = OCR_CACHE_SIZE, max_distance: int = OCR_CACHE_MAX_DISTANCE,
+                 hash_size: tuple = OCR_CACHE_HASH_SIZE):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self._entries = OrderedDict()  # hash(int) -> 결과 dict
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0, "evictions": 0}
+
+    def key(self, plate_image: np.ndarray) -> int:
+        gray = cv2.cvtColor(plate_image, cv2.COLOR_BGR2GRAY) if len(plate_image.shape) == 3 else plate_image
+        w, h = self.hash_size
+        small = cv2.resize(gray, (w + 1, h), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).ravel()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def get(self, key: int):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None and self.max_distance > 0:
+                # 최근 항목부터 해밍 거리 비교 (연속 프레임은 대부분 가장 최근 항목과 일치)
+                for cached_key in reversed(self._entries):
+                    if (cached_key ^ key).bit_count() <= self.max_distance:
+                        result = self._entries[cached_key]
+                        key = cached_key
+                        self.stats["near_hits"] += 1
+                        break
+            if result is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+            return dict(result, cached=True)
+
+    def put(self, key: int, result: dict):
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+# =====================================================================
+# 6. 통합 OCR 파이프라인
 # =====================================================================
 class HighAccuracyOCR:
-    def __init__(self):
+    def __init__(self, multi_ocr: MultiEngineOCR = None, cache: PlateOCRCache = None):
         self.preprocessor = PlateImagePreprocessor()
         self.deskewer = PlateDeskewer()
-        self.multi_ocr = MultiEngineOCR()
+        self.multi_ocr = multi_ocr if multi_ocr is not None else MultiEngineOCR()
         self.postprocessor = OCRPostProcessor()
+        # 캐시를 넘기지 않으면 OCR_CACHE_ENABLED일 때 인스턴스 전용 캐시 생성
+        if cache is None and OCR_CACHE_ENABLED:
+            cache = PlateOCRCache()
+        self.cache = cache
     
     def recognize_plate(self, plate_image: np.ndarray):
+        key = self.cache.key(plate_image) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        result = self._recognize_uncached(plate_image)
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _recognize_uncached(self, plate_image: np.ndarray):
         # 1. 각도 보정
         plate_image = self.deskewer.deskew_plate(plate_image)
         # 2. 전처리
         preprocessed = self.preprocessor.preprocess_for_ocr(plate_image)
         # 3. 인식
-        ocr_result = self.multi_ocr.recognize_with_all_engines(preprocessed)
+        ocr_result = self.multi_ocr.recognize(preprocessed)
         # 4. 후처리
+        return self._build_result(ocr_result)
+
+    def _build_result(self, ocr_result: dict):
         raw_text = ocr_result['text']
+        slots = self.postprocessor.decode_korean_plate(raw_text)
         normalized = self.postprocessor.postprocess_korean_plate(raw_text)
         is_valid, msg = self.postprocessor.validate_plate_format(normalized)
         
         return {
             'normalized_text': normalized,
             'is_valid': is_valid,
-            'ocr_confidence': ocr_result.get('confidence', 0.0)
+            'ocr_confidence': ocr_result.get('confidence', 0.0),
+            # 자리별 투표용 (앞자리, 한글, 뒷자리) - 형식에 맞지 않으면 None
+            'slots': slots,
+            # 지역명(구형 번호판, 예: 서울) - 자리별 투표 결과 앞에 붙이기 위함
+            'region': self.postprocessor.region_prefix(raw_text, slots)
         }
 
+    def recognize_plates(self, plate_images: list, batch_size: int = OCR_BATCH_SIZE):
+        """
+        여러 크롭을 각도 보정/전처리 후 batch_size 단위로 묶어 인식 (결과 순서는 입력과 동일)
+        캐시에 있는 크롭은 제외하고 나머지만 배치로 인식
+        """
+        outputs = [None] * len(plate_images)
+        keys = [None] * len(plate_images)
+        misses = []
+        for i, img in enumerate(plate_images):
+            if self.cache is not None:
+                keys[i] = self.cache.key(img)
+                outputs[i] = self.cache.get(keys[i])
+            if outputs[i] is None:
+                misses.append(i)
+
+        for start in range(0, len(misses), batch_size):
+            chunk = misses[start:start + batch_size]
+            preprocessed = [self.preprocessor.preprocess_for_ocr(self.deskewer.deskew_plate(plate_images[i]))
+                            for i in chunk]
+            for i, ocr_result in zip(chunk, self.multi_ocr.recognize_batch(preprocessed)):
+                outputs[i] = self._build_result(ocr_result)
+                if self.cache is not None:
+                    self.cache.put(keys[i], outputs[i])
+        return outputs
+
 # =====================================================================
-# 6. [핵심] 서버 연동용 모듈 (YOLO + Voting 포함)
+# 7. 크롭 품질 점수 (비싼 전처리/OCR 전에 상위 크롭만 고르기 위함)
+# =====================================================================
+class PlateQualityScorer:
+    """
+    검출된 번호판 크롭의 OCR 적합도를 값싸게 추정
+    점수 = 검출 확신도 x 면적 x 선명도 x 가로세로비 (클수록 좋음)
+    - 선명도: 높이를 고정 크기로 줄인 뒤 라플라시안 분산 (흔들린 프레임일수록 작음)
+    - 가로세로비: 번호판 비율 범위를 벗어난 만큼 감점 (잘린 크롭 / 오검출)
+    """
+    def __init__(self, norm_height: int = PLATE_SHARPNESS_HEIGHT, sharpness_ref: float = PLATE_SHARPNESS_REF,
+                 aspect_range: tuple = PLATE_ASPECT_RANGE):
+        self.norm_height = norm_height
+        self.sharpness_ref = sharpness_ref
+        self.aspect_range = aspect_range
+
+    def sharpness(self, crop: np.ndarray) -> float:
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if len(crop.shape) == 3 else crop
+        h, w = gray.shape[:2]
+        if h == 0 or w == 0:
+            return 0.0
+        # 크기가 다른 크롭끼리 비교할 수 있도록 높이를 맞춤 (축소라서 비용도 작음)
+        width = max(1, int(round(w * self.norm_height / h)))
+        small = cv2.resize(gray, (width, self.norm_height), interpolation=cv2.INTER_AREA)
+        return float(cv2.Laplacian(small, cv2.CV_64F).var())
+
+    def aspect_factor(self, box) -> float:
+        w, h = float(box[2] - box[0]), float(box[3] - box[1])
+        if w <= 0 or h <= 0:
+            return 0.0
+        aspect = w / h
+        low, high = self.aspect_range
+        return min(1.0, aspect / low, high / aspect)
+
+    def score(self, crop: np.ndarray, box, conf: float) -> float:
+        area = float((box[2] - box[0]) * (box[3] - box[1]))
+        sharp = self.sharpness(crop)
+        # 0~1로 포화시켜서 선명도가 면적/확신도를 압도하지 않게 함
+        sharp_factor = sharp / (sharp + self.sharpness_ref)
+        return conf * area * sharp_factor * self.aspect_factor(box)
+
+# =====================================================================
+# 8. 번호판 트래커 (IoU / 중심거리 기반)
+# =====================================================================
+class PositionalPlateVoter:
+    """
+    글자 자리별 확신도 가중 투표.
+    같은 형식(앞자리 길이)끼리 묶고, 자리마다 가장 많이 가중 득표한 글자를 골라 합의 번호를 만듦
+    -> 프레임마다 다른 자리 한 글자씩 틀려도 나머지 프레임이 그 자리를 바로잡음
+    """
+    def __init__(self):
+        self.layouts = {}  # 앞자리 길이 -> {"confs": [확신도], "slots": [{글자: [확신도]}], "regions": {지역명: 확신도 합}}
+
+    def __bool__(self):
+        return bool(self.layouts)
+
+    def add(self, slots: tuple, conf: float, region: str = ""):
+        head, hangul, tail = slots
+        layout = self.layouts.setdefault(len(head), {"confs": [], "slots": [{} for _ in range(len(head) + 5)],
+                                                     "regions": {}})
+        layout["confs"].append(float(conf))
+        layout["regions"][region] = layout["regions"].get(region, 0.0) + float(conf)
+        for pos, ch in enumerate(head + hangul + tail):
+            if ch != OCRPostProcessor.UNKNOWN:
+                layout["slots"][pos].setdefault(ch, []).append(float(conf))
+
+    def consensus(self):
+        """
+        (합의 번호, 득표수, 평균 확신도, 2위와의 득표 차)
+        득표수 / 득표 차는 모든 자리 중 가장 약한 자리 기준 (한 자리라도 근거가 부족하면 확정하지 않음)
+        한 표도 받지 못한 자리가 있으면 합의 불가 -> (None, 0, 0.0, 0) (호출 쪽에서 문자열 단위 투표로 대체)
+        지역명은 확신도 합이 가장 큰 것을 앞에 붙임
+        """
+        if not self.layouts:
+            return None, 0, 0.0, 0
+        layout = max(self.layouts.values(), key=lambda l: (sum(l["confs"]), len(l["confs"])))
+        if not all(layout["slots"]):
+            return None, 0, 0.0, 0
+        region = max(layout["regions"].items(), key=lambda kv: kv[1])[0]
+        chars, votes, lead = [region], None, None
+        for candidates in layout["slots"]:
+            ranked = sorted(candidates.items(), key=lambda kv: (-sum(kv[1]), -len(kv[1])))
+            ch, confs = ranked[0]
+            runner_up = len(ranked[1][1]) if len(ranked) > 1 else 0
+            chars.append(ch)
+            votes = len(confs) if votes is None else min(votes, len(confs))
+            lead = len(confs) - runner_up if lead is None else min(lead, len(confs) - runner_up)
+        return "".join(chars), votes, float(np.mean(layout["confs"])), lead
+
+
+class PlateTrack:
+    def __init__(self, track_id: int, frame_idx: int, box: np.ndarray):
+        self.track_id = track_id
+        self.box = box
+        self.last_frame = frame_idx
+        self.hits = 0
+        self.samples = []  # [(score, frame_idx, crop)] - 점수 상위 top_k만 유지
+        self.ocr_frames = set()  # 이미 OCR 한 샘플의 frame_idx
+        self.votes = {}  # 번호판 문자열 -> [OCR 확신도, ...]
+        self.char_votes = PositionalPlateVoter()
+
+    def add(self, frame_idx: int, box: np.ndarray, conf: float, crop: np.ndarray, top_k: int,
+            score: float = None):
+        self.box = box
+        self.last_frame = frame_idx
+        self.hits += 1
+        if score is None:
+            # 검출 확신도 x 박스 면적: 크고 확실하게 잡힌 크롭일수록 OCR에 유리
+            score = conf * float((box[2] - box[0]) * (box[3] - box[1]))
+        self.samples.append((score, frame_idx, crop))
+        self.samples.sort(key=lambda x: -x[0])
+        del self.samples[top_k:]
+
+    def best_crops(self):
+        return [crop for _, _, crop in self.samples]
+
+    def pending_samples(self, limit: int = None):
+        """아직 OCR 하지 않은 상위 샘플 [(score, frame_idx, crop)] (점수 순)"""
+        pending = [sample for sample in self.samples if sample[1] not in self.ocr_frames]
+        return pending[:limit] if limit else pending
+
+    def add_vote(self, frame_idx: int, text: str, conf: float, slots: tuple = None, region: str = ""):
+        """
+        OCR 판독 1건을 투표에 반영. 표는 프레임당 1표 (같은 프레임을 다시 넣으면 무시)
+        OCR 캐시 적중도 그 프레임의 판독이므로 1표로 셈 (캐시는 엔진 호출만 줄이고 표 수는 바꾸지 않음)
+        """
+        if frame_idx in self.ocr_frames:
+            return
+        self.ocr_frames.add(frame_idx)
+        if text:
+            self.votes.setdefault(text, []).append(float(conf))
+        if slots:
+            self.char_votes.add(slots, conf, region)
+
+    def leader(self, positional: bool = PLATE_POSITIONAL_VOTING):
+        """
+        확신도 가중 득표 1위 (문자열, 득표수, 평균 확신도, 2위와의 득표 차)
+        positional이면 자리별 투표 결과, 합의가 안 되면(형식에 맞는 판독이 없거나 빈 자리가 있으면) 문자열 단위 투표 결과
+        """
+        if positional and self.char_votes:
+            consensus = self.char_votes.consensus()
+            if consensus[0] is not None:
+                return consensus
+        if not self.votes:
+            return None, 0, 0.0, 0
+        ranked = sorted(self.votes.items(), key=lambda kv: (-sum(kv[1]), -len(kv[1])))
+        text, confs = ranked[0]
+        runner_up = len(ranked[1][1]) if len(ranked) > 1 else 0
+        return text, len(confs), float(np.mean(confs)), len(confs) - runner_up
+
+    def is_decided(self, margin: int = PLATE_VOTE_MARGIN, min_conf: float = PLATE_MIN_MEAN_CONF) -> bool:
+        text, _, mean_conf, lead = self.leader()
+        return text is not None and lead >= margin and mean_conf >= min_conf
+
+
+class PlateTracker:
+    """
+    프레임마다 검출된 번호판 박스를 이전 프레임 트랙과 IoU(겹침)로 이어붙임.
+    IoU가 낮아도 중심점이 박스 크기 안쪽으로 가까우면(빠른 이동) 같은 트랙으로 간주
+    """
+    def __init__(self, iou_threshold: float = PLATE_TRACK_IOU, max_missed: int = PLATE_TRACK_MAX_MISSED,
+                 top_k: int = PLATE_TRACK_TOP_K, scorer: PlateQualityScorer = None):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.top_k = top_k
+        # scorer가 없으면 검출 확신도 x 면적으로만 크롭 순위를 매김
+        self.scorer = scorer
+        self.tracks = []
+        self._next_id = 0
+
+    @staticmethod
+    def _iou(a, b) -> float:
+        ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+        ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+        inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        return inter / union if union > 0 else 0.0
+
+    @staticmethod
+    def _center_close(a, b) -> bool:
+        dx = abs((a[0] + a[2]) - (b[0] + b[2])) / 2
+        dy = abs((a[1] + a[3]) - (b[1] + b[3])) / 2
+        return dx < (a[2] - a[0]) * 0.5 and dy < (a[3] - a[1]) * 0.5
+
+    def _score(self, box, conf, crop):
+        return self.scorer.score(crop, box, conf) if self.scorer is not None else None
+
+    def update(self, frame_idx: int, detections):
+        """detections: [(box(x1,y1,x2,y2), conf, crop)] - 한 프레임의 검출 결과"""
+        alive = [t for t in self.tracks if frame_idx - t.last_frame <= self.max_missed]
+
+        # IoU가 큰 쌍부터 탐욕적으로 매칭
+        pairs = []
+        for di, (box, _, _) in enumerate(detections):
+            for ti, track in enumerate(alive):
+                iou = self._iou(track.box, box)
+                if iou >= self.iou_threshold or self._center_close(track.box, box):
+                    pairs.append((iou, di, ti))
+        pairs.sort(key=lambda x: -x[0])
+
+        used_det, used_track = set(), set()
+        for _, di, ti in pairs:
+            if di in used_det or ti in used_track:
+                continue
+            used_det.add(di)
+            used_track.add(ti)
+            box, conf, crop = detections[di]
+            alive[ti].add(frame_idx, box, conf, crop, self.top_k, self._score(box, conf, crop))
+
+        # 매칭 안 된 검출은 새 트랙
+        for di, (box, conf, crop) in enumerate(detections):
+            if di in used_det:
+                continue
+            track = PlateTrack(self._next_id, frame_idx, box)
+            track.add(frame_idx, box, conf, crop, self.top_k, self._score(box, conf, crop))
+            self._next_id += 1
+            self.tracks.append(track)
+
+    def confirmed_tracks(self, min_hits: int = PLATE_TRACK_MIN_HITS):
+        return [t for t in self.tracks if t.hits >= min_hits]
+
+# =====================================================================
+# 9. [핵심] 서버 연동용 모듈 (YOLO + Tracking + Voting 포함)
 # =====================================================================
 class PlateRecognizerModule:
     """서버에서 위반 구간 영상을 받아 번호판을 추출하는 클래스"""
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, model=None, ocr: HighAccuracyOCR = None):
+        # model / ocr을 넘기면 로드 없이 그대로 사용 (벤치마크 스텁 주입용)
         print(f"🔧 번호판 인식 모듈 초기화 중... (YOLO: {model_path})")
-        self.model = YOLO(model_path) 
-        self.ocr = HighAccuracyOCR()
+        self.model = model if model is not None else YOLO(model_path) 
+        self.ocr = ocr if ocr is not None else HighAccuracyOCR()
+        self.scorer = PlateQualityScorer() if PLATE_QUALITY_SCORING else None
         
     def process_segment(self, video_path: str, start_frame: int, count: int):
         """
@@ -210,46 +795,173 @@ class PlateRecognizerModule:
         cap = cv2.VideoCapture(video_path)
         cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
         
-        detected_plates = []
-        
         # print(f"🔍 번호판 정밀 분석 시작 (구간: {start_frame} ~ {start_frame+count})")
         
-        for _ in range(count):
-            ret, frame = cap.read()
-            if not ret: break
-            
-            # 1. YOLO로 번호판 위치 탐지
+        # 필요한 만큼만 디코딩하도록 제너레이터로 전달 (투표가 일찍 끝나면 나머지는 읽지 않음)
+        def read_frames():
+            for _ in range(count):
+                ret, frame = cap.read()
+                if not ret: break
+                yield frame
+
+        try:
+            return self.process_frames(read_frames())
+        finally:
+            cap.release()
+
+    def process_frames(self, frames, vehicle_boxes=None):
+        """
+        이미 디코딩된 위반 구간 프레임(BGR 원본) 목록에서
+        가장 확실한 번호판 텍스트를 반환 (상세 결과는 process_frames_detailed)
+        """
+        return self.process_frames_detailed(frames, vehicle_boxes)['plate']
+
+    @staticmethod
+    def _expand_roi(box, w: int, h: int, margin: float = PLATE_ROI_MARGIN):
+        x1, y1, x2, y2 = (int(v) for v in box[:4])
+        mx, my = int((x2 - x1) * margin), int((y2 - y1) * margin)
+        return max(0, x1 - mx), max(0, y1 - my), min(w, x2 + mx), min(h, y2 + my)
+
+    def _detect_boxes(self, frame, rois, stats):
+        """
+        번호판 박스 탐지 -> [(원본 좌표 box(x1,y1,x2,y2), conf)]
+        - rois(차량 박스)가 있으면 차량 크롭들만 PLATE_ROI_IMGSZ 입력으로 한 번에 배치 탐지 후 크롭 원점만큼 좌표 이동
+        - 차량이 없거나 차량 안에서 못 찾으면 긴 변을 PLATE_FALLBACK_MAX_SIDE로 줄인 전체 프레임에서 탐지 후 좌표 확대
+        - PLATE_ROI_MODE가 꺼져 있으면 기존처럼 원본 해상도 전체 프레임 탐지
+        """
+        h, w = frame.shape[:2]
+        if not PLATE_ROI_MODE:
             results = self.model(frame, conf=0.4, verbose=False)
-            if not results: continue
+            stats["full"] += 1
+            return [(box.xyxy[0].cpu().numpy().astype(int), float(box.conf[0]))
+                    for box in (results[0].boxes if results else [])]
+
+        found = []
+        regions = [r for r in (self._expand_roi(b, w, h) for b in (rois or [])) if r[2] > r[0] and r[3] > r[1]]
+        if regions:
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+            results = self.model(crops, conf=0.4, imgsz=PLATE_ROI_IMGSZ, verbose=False)
+            stats["roi"] += 1
+            for (x1, y1, _, _), result in zip(regions, results):
+                for box in result.boxes:
+                    bx1, by1, bx2, by2 = box.xyxy[0].cpu().numpy().astype(int)
+                    candidate = (np.array([bx1 + x1, by1 + y1, bx2 + x1, by2 + y1]), float(box.conf[0]))
+                    # 차량 박스가 겹치면 같은 번호판이 두 번 잡히므로 확신도 높은 쪽만 남김
+                    dup = next((i for i, (b, _) in enumerate(found)
+                                if PlateTracker._iou(b, candidate[0]) > 0.5), None)
+                    if dup is None:
+                        found.append(candidate)
+                    elif candidate[1] > found[dup][1]:
+                        found[dup] = candidate
+            if found:
+                return found
+
+        scale = min(1.0, PLATE_FALLBACK_MAX_SIDE / max(h, w))
+        small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) \
+            if scale < 1.0 else frame
+        results = self.model(small, conf=0.4, verbose=False)
+        stats["fallback"] += 1
+        for box in (results[0].boxes if results else []):
+            coords = box.xyxy[0].cpu().numpy() / scale
+            found.append((coords.astype(int), float(box.conf[0])))
+        return found
+
+    @staticmethod
+    def _limit_jobs(jobs, limit: int):
+        """
+        구간 전체 OCR 크롭 수를 limit 장으로 제한.
+        트랙마다 최고 점수 1장은 보장하고 (번호판 누락 방지), 나머지는 점수 순으로 채움
+        """
+        if not limit or len(jobs) <= limit:
+            return jobs
+        first, rest, seen = [], [], set()
+        for job in sorted(jobs, key=lambda j: -j[1]):
+            if job[0].track_id in seen:
+                rest.append(job)
+            else:
+                seen.add(job[0].track_id)
+                first.append(job)
+        return first + rest[:max(0, limit - len(first))]
+
+    def _ocr_tracks(self, tracks, per_track: int = None, limit: int = None):
+        """트랙별 미처리 상위 샘플을 모아서 한 번에 배치 OCR 후 각 트랙에 투표. 실제로 OCR 엔진에 넣은 장수 반환 (캐시 적중 제외)"""
+        jobs = [(track, score, frame_idx, crop) for track in tracks
+                for score, frame_idx, crop in track.pending_samples(per_track)]
+        jobs = self._limit_jobs(jobs, limit)
+        if not jobs:
+            return 0
+        ocr_results = self.ocr.recognize_plates([crop for _, _, _, crop in jobs])
+        for (track, _, frame_idx, _), res in zip(jobs, ocr_results):
+            track.add_vote(frame_idx, res['normalized_text'] if res['is_valid'] else "",
+                           res['ocr_confidence'], res.get('slots'), res.get('region', ""))
+        return sum(1 for res in ocr_results if not res.get('cached'))
+
+    def process_frames_detailed(self, frames, vehicle_boxes=None):
+        """
+        1) 프레임마다 번호판 검출 -> 2) IoU 트래커로 같은 번호판끼리 묶음
+        3) 품질 점수(PlateQualityScorer) 상위 크롭만 배치 OCR -> 4) 트랙 안에서 확신도 가중 투표
+        - PLATE_SEGMENT_TOP_K: 구간 전체에서 전처리/OCR 할 크롭 수 상한
+        - vehicle_boxes: 프레임별 차량 박스 목록 (frames와 같은 순서). 있으면 차량 영역 안에서만 번호판 탐지
+        - frames는 리스트 또는 제너레이터 (제너레이터면 조기 종료 시 나머지 디코딩도 생략)
+        - PLATE_EARLY_STOP: PLATE_VOTE_CHUNK 프레임마다 중간 투표해서 모든 트랙의 1위가
+          PLATE_VOTE_MARGIN 표 차 + 평균 확신도 PLATE_MIN_MEAN_CONF 이상이면 바로 종료
+        """
+        tracker = PlateTracker(scorer=self.scorer)
+        frames_used = 0
+        ocr_calls = 0
+        early_stopped = False
+        detector_calls = {"roi": 0, "fallback": 0, "full": 0}
+        
+        for frame_idx, frame in enumerate(frames):
+            frames_used += 1
+            # 1. YOLO로 번호판 위치 탐지 (좌표는 원본 해상도 기준)
+            rois = vehicle_boxes[frame_idx] if vehicle_boxes and frame_idx < len(vehicle_boxes) else None
             
-            for box in results[0].boxes:
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-                
-                # 좌표 보정
+            detections = []
+            for (x1, y1, x2, y2), conf in self._detect_boxes(frame, rois, detector_calls):
+                # 좌표 보정 (원본 프레임에서 자름)
                 h, w = frame.shape[:2]
                 pad = 5
                 crop = frame[max(0, y1-pad):min(h, y2+pad), max(0, x1-pad):min(w, x2+pad)]
                 
                 if crop.size == 0: continue
+                detections.append((np.array([x1, y1, x2, y2]), conf, crop))
 
-                # 2. OCR 수행
-                ocr_res = self.ocr.recognize_plate(crop)
-                
-                if ocr_res['is_valid']:
-                    detected_plates.append(ocr_res['normalized_text'])
+            # 2. 트래킹 (같은 번호판끼리 묶기)
+            tracker.update(frame_idx, detections)
 
-        cap.release()
-        
-        # 3. 투표 (최빈값 선정)
-        if detected_plates:
-            # 가장 많이 나온 번호와 횟수
-            most_common = Counter(detected_plates).most_common(1)[0]
-            plate_text, count = most_common
-            
+            # 3. 중간 투표: 트랙마다 가장 좋은 미처리 크롭 1장씩만 OCR 후 확정 여부 확인
+            if PLATE_EARLY_STOP and frames_used % PLATE_VOTE_CHUNK == 0:
+                tracks = tracker.confirmed_tracks()
+                ocr_calls += self._ocr_tracks(tracks, per_track=1)
+                if tracks and all(t.is_decided() for t in tracks):
+                    early_stopped = True
+                    break
+
+        # 4. 마무리: 트랙별 상위 k개 중 아직 OCR 안 한 크롭 처리 (조기 종료 시에는 생략)
+        tracks = tracker.confirmed_tracks()
+        if not early_stopped:
+            # 중간 투표에서 이미 쓴 장수만큼 구간 상한에서 차감
+            limit = max(1, PLATE_SEGMENT_TOP_K - ocr_calls) if PLATE_SEGMENT_TOP_K else None
+            ocr_calls += self._ocr_tracks(tracks, limit=limit)
+
+        plates = []
+        for track in tracks:
+            text, votes, mean_conf, _ = track.leader()
+            if not text:
+                continue
             # 최소 2번 이상은 동일하게 인식되어야 인정
-            if count >= 2:
-                return plate_text
-            else:
-                return f"{plate_text}(불확실)"
-        
-        return "식별불가"
\ No newline at end of file
+            plate_text = text if votes >= 2 else f"{text}(불확실)"
+            plates.append({"track_id": track.track_id, "plate": plate_text, "votes": votes,
+                           "confidence": round(mean_conf, 3), "hits": track.hits})
+
+        # 가장 많이 맞춘(동률이면 오래 보인) 번호판을 대표값으로 사용
+        plates.sort(key=lambda p: (-p["votes"], -p["hits"]))
+        return {
+            "plate": plates[0]["plate"] if plates else "식별불가",
+            "plates": plates,
+            "frames_used": frames_used,
+            "ocr_calls": ocr_calls,
+            "early_stopped": early_stopped,
+            "detector_calls": detector_calls,
+        }
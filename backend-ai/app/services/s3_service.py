@@ -1,6 +1,15 @@
 import boto3
 import os
-from app.core.config import BUCKET_NAME, AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_CONFIG, AWS_REGION
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from boto3.s3.transfer import TransferConfig
+from app.core.config import (
+    BUCKET_NAME, AWS_ACCESS_KEY, AWS_SECRET_KEY, S3_CONFIG, AWS_REGION,
+    S3_MULTIPART_THRESHOLD, S3_MULTIPART_CHUNKSIZE, S3_MAX_CONCURRENCY, S3_STREAM_URL_EXPIRES,
+    PRESIGN_EXPIRES, PRESIGN_REFRESH_MARGIN, PRESIGN_CACHE_SIZE
+)
 
 class S3Service:
     def __init__(self):
@@ -16,21 +25,87 @@ class S3Service:
             config=S3_CONFIG
         )
         self.bucket = BUCKET_NAME
+        # 멀티파트 전송 설정 (boto3 기본값은 파트 8MB / 동시 10개 고정)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+        # 미리보기 URL 캐시 {key: (url, 만료 시각)} - LRU
+        self._url_cache = OrderedDict()
+        self._url_lock = threading.Lock()
+        self.presign_stats = {"hits": 0, "misses": 0}
+
+    def _sign(self, key):
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': key},
+            ExpiresIn=PRESIGN_EXPIRES
+        )
 
     def get_presigned_url(self, key):
+        return self.get_presigned_urls([key])[key]
+
+    def get_presigned_urls(self, keys):
+        """
+        {key: 미리보기 URL}. 만료까지 PRESIGN_REFRESH_MARGIN 이상 남은 URL은 캐시에서 재사용하고,
+        새로 서명할 키는 한 번에 모아서 서명 (lock은 캐시 조회/저장할 때만 잡음)
+        """
+        now = time.time()
+        urls, stale = {}, []
+        with self._url_lock:
+            for key in keys:
+                cached = self._url_cache.get(key)
+                if cached and cached[1] - PRESIGN_REFRESH_MARGIN > now:
+                    self._url_cache.move_to_end(key)
+                    urls[key] = cached[0]
+                    self.presign_stats["hits"] += 1
+                elif key not in urls:
+                    urls[key] = None
+                    stale.append(key)
+            self.presign_stats["misses"] += len(stale)
+
+        expires_at = now + PRESIGN_EXPIRES
+        signed = {key: self._sign(key) for key in stale}
+        urls.update(signed)
+
+        if signed:
+            with self._url_lock:
+                for key, url in signed.items():
+                    self._url_cache[key] = (url, expires_at)
+                    self._url_cache.move_to_end(key)
+                while len(self._url_cache) > PRESIGN_CACHE_SIZE:
+                    self._url_cache.popitem(last=False)
+        return urls
+
+    def presign_cache_stats(self):
+        with self._url_lock:
+            total = self.presign_stats["hits"] + self.presign_stats["misses"]
+            return dict(self.presign_stats, entries=len(self._url_cache),
+                        hit_rate=round(self.presign_stats["hits"] / total, 3) if total else 0.0)
+
+    def get_stream_url(self, key):
+        """분석기가 다운로드 없이 바로 디코딩할 URL (cv2.VideoCapture에 넘기면 Range GET으로 읽음)"""
         return self.client.generate_presigned_url(
             'get_object',
             Params={'Bucket': self.bucket, 'Key': key},
-            ExpiresIn=3600
+            ExpiresIn=S3_STREAM_URL_EXPIRES
         )
 
     def download_file(self, key, local_path):
-        self.client.download_file(self.bucket, key, local_path)
+        self.client.download_file(self.bucket, key, local_path, Config=self.transfer_config)
 
     def upload_file(self, local_path, key):
-        self.client.upload_file(local_path, self.bucket, key)
+        self.client.upload_file(local_path, self.bucket, key, Config=self.transfer_config)
+
+    # 이벤트 루프에서 호출하는 경우: 전송은 스레드에서 실행 (boto3 클라이언트는 스레드 안전)
+    async def upload_file_async(self, local_path, key):
+        await asyncio.to_thread(self.upload_file, local_path, key)
         
     def delete_file(self, s3_key):
+        with self._url_lock:
+            self._url_cache.pop(s3_key, None)
         try:
             print(f"🗑️ Deleting from S3: {s3_key}")
             # ★ [수정 핵심] self.s3 -> self.client 로 변경
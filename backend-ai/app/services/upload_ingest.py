@@ -0,0 +1,76 @@
+# 파일명: upload_ingest.py
+
+import os
+import hashlib
+import asyncio
+from app.core.config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES
+
+# =====================================================================
+# 업로드 영상 수신 (traffic /upload-video, main /api/analyze-video, /api/jobs 공용)
+# - UploadFile을 고정 크기 청크로 읽어서 디스크에 기록 (파일 쓰기/해시 계산은 스레드에서 -> 이벤트 루프를 막지 않음)
+# - 기록하면서 sha256을 같이 계산 (파일을 다시 읽지 않음)
+# - 최대 크기를 넘으면 선언된 크기로 먼저 거절하고, 기록 중에도 넘는 순간 중단
+# =====================================================================
+class UploadTooLargeError(Exception):
+    """업로드 크기가 상한을 넘음 (413으로 응답)"""
+    def __init__(self, max_bytes: int):
+        super().__init__(f"업로드 크기 상한({max_bytes // (1024 * 1024)}MB)을 초과했습니다.")
+        self.max_bytes = max_bytes
+
+
+class IngestedUpload:
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+
+def safe_filename(filename: str) -> str:
+    """클라이언트가 보낸 파일명에서 경로 부분 제거 (../ 등으로 임시 폴더 밖에 쓰지 않도록)"""
+    name = os.path.basename((filename or "").replace("\\", "/"))
+    return name or "upload.mp4"
+
+
+def _write_chunk(f, digest, chunk: bytes):
+    f.write(chunk)
+    digest.update(chunk)
+
+
+def _discard(f, path: str):
+    f.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def ingest_upload(upload, dest_dir: str, max_bytes: int = UPLOAD_MAX_BYTES,
+                        chunk_size: int = UPLOAD_CHUNK_SIZE) -> IngestedUpload:
+    """
+    upload(fastapi.UploadFile)을 dest_dir/파일명 으로 저장하고 IngestedUpload 반환
+    기록 중에는 '.part' 파일에 쓰고 끝나면 이름을 바꾸므로, 분석 쪽에서 덜 써진 파일을 보는 일이 없음
+    """
+    filename = safe_filename(upload.filename)
+    declared = getattr(upload, "size", None)  # multipart 파트 크기 (starlette가 알려주는 경우만)
+    if max_bytes and declared and declared > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    path = os.path.join(dest_dir, filename)
+    part_path = path + ".part"
+    digest = hashlib.sha256()
+    size = 0
+    f = await asyncio.to_thread(open, part_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            await asyncio.to_thread(_write_chunk, f, digest, chunk)
+    except BaseException:
+        await asyncio.to_thread(_discard, f, part_path)
+        raise
+    await asyncio.to_thread(f.close)
+    os.replace(part_path, path)
+    return IngestedUpload(path, filename, size, digest.hexdigest())
@@ -0,0 +1,104 @@
+# 파일명: video_cache.py
+
+import os
+import time
+import shutil
+import hashlib
+import threading
+from app.core.config import VIDEO_CACHE_ENABLED, VIDEO_CACHE_DIR, VIDEO_CACHE_MAX_BYTES, VIDEO_CACHE_GRACE_SEC
+
+# =====================================================================
+# 로컬 영상 캐시 (내용 주소 방식: 파일 이름 = sha256)
+# - 웹 업로드 영상을 S3에 올린 뒤 분석 워커가 같은 바이트를 다시 내려받지 않도록 디스크에 보관
+# - S3 키 -> sha256 매핑은 refs/ 아래 작은 파일로 저장 (분석 워커는 별도 프로세스라 메모리 공유 불가)
+# - 용량 상한을 넘으면 마지막 사용 시각(mtime)이 오래된 것부터 삭제 (LRU)
+#   단, 최근 grace_sec 안에 쓰인 파일은 분석/S3 업로드 중일 수 있으므로 삭제하지 않음
+# =====================================================================
+class LocalVideoCache:
+    def __init__(self, root: str = VIDEO_CACHE_DIR, max_bytes: int = VIDEO_CACHE_MAX_BYTES,
+                 grace_sec: float = VIDEO_CACHE_GRACE_SEC, enabled: bool = VIDEO_CACHE_ENABLED):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.grace_sec = grace_sec
+        self.enabled = enabled
+        self._blob_dir = os.path.join(root, "blobs")
+        self._ref_dir = os.path.join(root, "refs")
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        if enabled:
+            os.makedirs(self._blob_dir, exist_ok=True)
+            os.makedirs(self._ref_dir, exist_ok=True)
+
+    def _blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self._blob_dir, digest + ext)
+
+    def _ref_path(self, key: str) -> str:
+        return os.path.join(self._ref_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+    def put(self, src_path: str, digest: str, key: str = None) -> str:
+        """
+        src_path 파일을 캐시로 옮기고(이동, 복사 아님) 캐시 안 경로 반환. 같은 내용이 이미 있으면 src는 삭제
+        key(S3 키)를 주면 lookup(key)로 찾을 수 있게 매핑을 남김
+        """
+        blob = self._blob_path(digest, os.path.splitext(src_path)[1].lower())
+        with self._lock:
+            if os.path.exists(blob):
+                os.remove(src_path)
+            else:
+                shutil.move(src_path, blob)  # 같은 디스크면 rename
+            os.utime(blob)
+            if key:
+                with open(self._ref_path(key), "w", encoding="utf-8") as f:
+                    f.write(os.path.basename(blob))
+            self.stats["puts"] += 1
+            self._evict()
+        return blob
+
+    def lookup(self, key: str):
+        """S3 키에 해당하는 캐시 파일 경로 (없으면 None). 찾으면 사용 시각을 갱신"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._ref_path(key), encoding="utf-8") as f:
+                blob = os.path.join(self._blob_dir, f.read().strip())
+            os.utime(blob)
+        except (FileNotFoundError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return blob
+
+    def _evict(self):
+        entries, total = [], 0
+        for entry in os.scandir(self._blob_dir):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:  # 다른 프로세스가 먼저 삭제
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if now - mtime < self.grace_sec:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats["evictions"] += 1
+        # 가리키는 파일이 없어진 매핑 정리
+        existing = set(os.listdir(self._blob_dir))
+        for entry in os.scandir(self._ref_dir):
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    if f.read().strip() not in existing:
+                        os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+video_cache = LocalVideoCache()
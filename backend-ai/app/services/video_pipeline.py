@@ -0,0 +1,559 @@
+# 파일명: video_pipeline.py
+
+import time
+import queue
+import bisect
+import threading
+import cv2
+import numpy as np
+from collections import deque
+from app.core.config import (
+    SEQUENCE_LENGTH, STEP_SIZE, TF_INPUT_SIZE, TF_WINDOW_BATCH,
+    YOLO_CONF, YOLO_BATCH_SIZE, YOLO_DETECT_STRIDE, PLATE_FRAME_BUDGET_MB,
+    PIPELINE_PREPROCESS_WORKERS, PIPELINE_QUEUE_DEPTH, ANALYSIS_FPS,
+    MOTION_THRESHOLD, MOTION_GATE_SIZE, PLATE_ROI_CLASSES
+)
+
+# =====================================================================
+# 0. 디코딩 (목표 FPS로 재샘플링)
+# =====================================================================
+class VideoOpenError(RuntimeError):
+    """cv2.VideoCapture가 영상을 열지 못함 (스트리밍 URL이면 FFmpeg 빌드가 네트워크 프로토콜을 지원하지 않는 경우 등)"""
+
+class VideoFrameReader:
+    """
+    cv2.VideoCapture 래퍼. 원본 FPS가 target_fps보다 높으면 필요 없는 프레임은
+    cap.grab()으로 건너뛰고(디코딩 결과를 꺼내지 않음) 필요한 프레임만 retrieve 함.
+    read()가 돌려주는 프레임 순번(분석 인덱스)과 원본 프레임 번호/시간의 매핑을 유지
+    - start: 이 분석 인덱스부터 읽도록 원본 위치로 seek (구간 분할 분석용, 재샘플링 눈금은 처음부터 읽은 것과 동일)
+    """
+    def __init__(self, cap, target_fps: float = ANALYSIS_FPS, start: int = 0):
+        self.cap = cap
+        self.source_fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        self.resampling = target_fps > 0 and self.source_fps > target_fps
+        self.target_fps = target_fps if self.resampling else self.source_fps
+        self._ratio = self.target_fps / self.source_fps if self.resampling else 1.0
+        self.start = start
+        self._next_source_idx = self.first_source_index(start)
+        if self._next_source_idx:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, self._next_source_idx)
+        self.source_indices = []  # (분석 인덱스 - start) -> 원본 프레임 번호
+
+    def first_source_index(self, analysis_idx: int) -> int:
+        """분석 인덱스 analysis_idx가 되는 첫 원본 프레임 번호 (floor(s * ratio) == analysis_idx 인 최소 s)"""
+        if not self.resampling:
+            return analysis_idx
+        s = int(analysis_idx / self._ratio)
+        while s > 0 and int((s - 1) * self._ratio + 1e-9) >= analysis_idx:
+            s -= 1
+        while int(s * self._ratio + 1e-9) < analysis_idx:
+            s += 1
+        return s
+
+    def _wanted(self, source_idx: int) -> bool:
+        # 출력 시간축(target_fps)의 눈금이 바뀌는 원본 프레임만 사용
+        if source_idx == 0:
+            return True
+        return int(source_idx * self._ratio + 1e-9) > int((source_idx - 1) * self._ratio + 1e-9)
+
+    def read(self):
+        while True:
+            source_idx = self._next_source_idx
+            if not self.cap.grab():
+                return False, None
+            self._next_source_idx += 1
+            if self.resampling and not self._wanted(source_idx):
+                continue
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                return False, None
+            self.source_indices.append(source_idx)
+            return True, frame
+
+    def release(self):
+        self.cap.release()
+
+    def source_index(self, analysis_idx: int) -> int:
+        """분석 인덱스 -> 원본 영상 프레임 번호 (process_segment 등 원본 기준 오프셋용)"""
+        if 0 <= analysis_idx - self.start < len(self.source_indices):
+            return self.source_indices[analysis_idx - self.start]
+        return self.first_source_index(analysis_idx)
+
+    def timestamp(self, analysis_idx: int) -> float:
+        """분석 인덱스 -> 영상 내 시간(초)"""
+        if self.source_fps <= 0:
+            return 0.0
+        return self.source_index(analysis_idx) / self.source_fps
+
+def read_frames(video_path: str, analysis_indices):
+    """
+    분석 인덱스 목록(오름차순)에 해당하는 원본(풀해상도) 프레임만 seek 해서 디코딩
+    (후보 윈도우 재디코딩용. 모션 게이트 drop 모드처럼 인덱스가 띄엄띄엄이어도 됨)
+    """
+    if not analysis_indices:
+        return []
+    wanted = set(analysis_indices)
+    reader = VideoFrameReader(cv2.VideoCapture(video_path), start=analysis_indices[0])
+    frames = []
+    try:
+        for idx in range(analysis_indices[0], analysis_indices[-1] + 1):
+            ret, frame = reader.read()
+            if not ret:
+                break
+            if idx in wanted:
+                frames.append(frame)
+    finally:
+        reader.release()
+    return frames
+
+# =====================================================================
+# 0-1. 모션 게이트 (정차/주차 구간 판별)
+# =====================================================================
+class MotionGate:
+    """
+    TF 입력용으로 이미 줄여둔 프레임을 한 번 더 축소(그레이)해서
+    '마지막으로 움직임이 있었던 프레임'과의 평균 밝기 차이로 정적 프레임을 판별.
+    직전 프레임이 아니라 마지막 활성 프레임과 비교하므로 아주 느린 변화도 누적되면 잡힘
+    """
+    def __init__(self, threshold: float = MOTION_THRESHOLD, size: tuple = MOTION_GATE_SIZE):
+        self.threshold = threshold
+        self.size = size
+        self._last_active = None
+        self.active_frames = 0
+        self.static_frames = 0
+
+    def is_active(self, small_frame: np.ndarray) -> bool:
+        thumb = cv2.resize(cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY), self.size,
+                           interpolation=cv2.INTER_AREA)
+        if self._last_active is not None and cv2.absdiff(thumb, self._last_active).mean() < self.threshold:
+            self.static_frames += 1
+            return False
+        self._last_active = thumb
+        self.active_frames += 1
+        return True
+
+    @property
+    def static_ratio(self) -> float:
+        total = self.active_frames + self.static_frames
+        return self.static_frames / total if total else 0.0
+
+# =====================================================================
+# 1. 슬라이딩 윈도우용 링 버퍼 (uint8)
+# =====================================================================
+class FrameWindowBuffer:
+    """
+    최근 seq_len 프레임만 uint8로 보관하는 링 버퍼.
+    같은 프레임을 [pos]와 [pos + seq_len] 두 곳에 기록(미러링)해 두면
+    어떤 시점이든 최근 seq_len 프레임이 연속 구간이 되므로 복사 없이 뷰로 꺼낼 수 있음
+    """
+    def __init__(self, seq_len: int, frame_shape: tuple):
+        self.seq_len = seq_len
+        self._buf = np.empty((2 * seq_len,) + tuple(frame_shape), dtype=np.uint8)
+        self.count = 0
+
+    def push(self, frame: np.ndarray):
+        pos = self.count % self.seq_len
+        self._buf[pos] = frame
+        self._buf[pos + self.seq_len] = frame
+        self.count += 1
+
+    def latest_window(self) -> np.ndarray:
+        """가장 최근 seq_len 프레임을 (seq_len, H, W, C) 뷰로 반환 (zero-copy)"""
+        start = self.count % self.seq_len
+        return self._buf[start:start + self.seq_len]
+
+# =====================================================================
+# 2. 스트리밍 윈도우 분류기
+# =====================================================================
+class StreamingWindowClassifier:
+    """
+    프레임을 하나씩 받아 윈도우(SEQUENCE_LENGTH, STEP_SIZE 간격)가 찰 때마다
+    float32로 정규화해 배치에 모으고, 배치가 차면 바로 모델에 넣는 분류기.
+    영상 길이와 무관하게 링 버퍼 + 배치 1개 분량의 메모리만 사용함
+    """
+    def __init__(self, predict_fn, seq_len: int = SEQUENCE_LENGTH, step: int = STEP_SIZE,
+                 window_batch: int = TF_WINDOW_BATCH, input_size: tuple = TF_INPUT_SIZE):
+        # predict_fn: (N, seq_len, H, W, 3) float32 배열 -> (N, num_classes) 확률
+        self.predict_fn = predict_fn
+        self.seq_len = seq_len
+        self.step = step
+
+        w, h = input_size
+        frame_shape = (h, w, 3)
+        self._window_buf = FrameWindowBuffer(seq_len, frame_shape)
+        self._batch = np.empty((window_batch, seq_len) + frame_shape, dtype=np.float32)
+        self._pending = []  # 현재 배치에 들어있는 윈도우 번호
+
+        self.window_count = 0
+        self.best_prob, self.best_class_idx, self.best_window_idx = 0, -1, -1
+
+    @property
+    def frame_count(self) -> int:
+        return self._window_buf.count
+
+    def push(self, small_frame: np.ndarray):
+        """TF 입력 크기로 리사이즈된 uint8 프레임 1장 추가. 이번에 예측된 윈도우 목록을 반환"""
+        self._window_buf.push(small_frame)
+        n = self._window_buf.count
+        if n < self.seq_len or (n - self.seq_len) % self.step != 0:
+            return []
+
+        # 윈도우 완성 -> 배치 슬롯에 float32 정규화 (원본 uint8 버퍼는 그대로)
+        slot = len(self._pending)
+        np.divide(self._window_buf.latest_window(), 255.0, out=self._batch[slot], dtype=np.float32)
+        self._pending.append(self.window_count)
+        self.window_count += 1
+
+        if len(self._pending) == len(self._batch):
+            return self._predict_pending()
+        return []
+
+    def flush(self):
+        """남아있는 미완성 배치를 예측"""
+        if self._pending:
+            return self._predict_pending()
+        return []
+
+    def _predict_pending(self):
+        n = len(self._pending)
+        predictions = self.predict_fn(self._batch[:n])
+
+        scored = []
+        for window_idx, pred in zip(self._pending, predictions):
+            # 기존 로직과 동일: 먼저 나온 윈도우가 동점이면 우선
+            idx = np.argmax(pred)
+            if pred[idx] > self.best_prob:
+                self.best_prob, self.best_class_idx, self.best_window_idx = pred[idx], idx, window_idx
+            scored.append((window_idx, pred))
+
+        self._pending = []
+        return scored
+
+# =====================================================================
+# 3. 배치 + 프레임 간격 샘플링 객체 탐지 (YOLO)
+# =====================================================================
+class BatchedObjectDetector:
+    """
+    매 프레임마다 YOLO를 호출하지 않고, stride 간격으로 샘플링한 프레임을
+    batch_size만큼 모아서 한 번에 추론. 결과는 감지된 클래스 이름 집합으로 누적
+    - keep_boxes: 차량(roi_classes) 박스를 프레임별로 보관 (번호판 ROI 탐지용)
+    """
+    def __init__(self, detector, batch_size: int = YOLO_BATCH_SIZE,
+                 stride: int = YOLO_DETECT_STRIDE, conf: float = YOLO_CONF,
+                 keep_boxes: bool = False, roi_classes: tuple = PLATE_ROI_CLASSES):
+        self.detector = detector
+        self.batch_size = max(1, batch_size)
+        self.stride = max(1, stride)
+        self.conf = conf
+        self.keep_boxes = keep_boxes
+        self.roi_classes = set(roi_classes)
+        self._frames = []
+        self._indices = []
+        self.detected_items = set()
+        self.frames_detected = 0
+        self.boxes = {}  # frame_idx -> [np.array([x1, y1, x2, y2])] (keep_boxes일 때만)
+
+    def push(self, frame_idx: int, frame: np.ndarray):
+        if frame_idx % self.stride != 0:
+            return
+        self._frames.append(frame)
+        self._indices.append(frame_idx)
+        if len(self._frames) >= self.batch_size:
+            self._run_batch()
+
+    def flush(self):
+        if self._frames:
+            self._run_batch()
+
+    def _run_batch(self):
+        # ultralytics는 이미지 리스트를 받으면 한 번의 배치 추론으로 처리
+        results = self.detector(self._frames, conf=self.conf, verbose=False)
+        for frame_idx, result in zip(self._indices, results):
+            vehicles = []
+            for box in result.boxes:
+                # 클래스 ID를 이름으로 변환
+                name = self.detector.names[int(box.cls[0])]
+                self.detected_items.add(name)
+                if self.keep_boxes and name in self.roi_classes:
+                    vehicles.append(box.xyxy[0].cpu().numpy().astype(int))
+            if self.keep_boxes:
+                self.boxes[frame_idx] = vehicles
+        self.frames_detected += len(self._frames)
+        self._frames = []
+        self._indices = []
+
+    def boxes_per_frame(self, count: int):
+        """0 ~ count-1 프레임의 차량 박스 목록 (boxes_for 참고)"""
+        return self.boxes_for(range(count))
+
+    def boxes_for(self, frame_indices):
+        """
+        지정한 프레임들의 차량 박스 목록. stride로 건너뛴 프레임은 직전 탐지 프레임의 박스를 사용
+        (탐지 결과가 하나도 없으면 None -> 번호판은 전체 프레임으로 탐지)
+        """
+        if not self.boxes:
+            return None
+        detected = sorted(self.boxes)
+        return [self.boxes[detected[max(0, bisect.bisect_right(detected, i) - 1)]] for i in frame_indices]
+
+    def retain_boxes(self, ranges):
+        """
+        [(start, stop)] 구간 밖 프레임의 박스는 버림 (번호판 인식에 쓸 후보 윈도우 구간만 남겨 메모리 일정)
+        stride로 건너뛴 구간 첫 프레임이 직전 탐지 박스를 쓸 수 있도록 구간 앞쪽은 stride만큼 더 남김
+        """
+        self.boxes = {i: b for i, b in self.boxes.items()
+                      if any(start - self.stride < i < stop for start, stop in ranges)}
+
+# =====================================================================
+# 4. 번호판 인식용 후보 윈도우 원본 프레임 보관
+# =====================================================================
+class CandidateWindowKeeper:
+    """
+    TF 예측이 끝나기 전까지 필요한 최근 원본 프레임만 들고 있다가,
+    예측 확률 상위 top_k 윈도우의 원본(풀해상도) 프레임만 남겨두는 클래스.
+    번호판 인식 시 영상을 다시 열어 seek 할 필요가 없어짐 (영상당 디코딩 1회)
+    - 보관에 필요한 메모리가 budget_mb를 넘으면(고해상도) 프레임은 보관하지 않고 후보 윈도우 번호만 기록,
+      frames_for() 때 loader(window_idx)로 해당 윈도우만 다시 디코딩 (loader가 없으면 항상 보관)
+    """
+    def __init__(self, top_k: int = 1, seq_len: int = SEQUENCE_LENGTH,
+                 step: int = STEP_SIZE, window_batch: int = TF_WINDOW_BATCH,
+                 loader=None, budget_mb: int = PLATE_FRAME_BUDGET_MB):
+        self.top_k = max(1, top_k)
+        self.seq_len = seq_len
+        self.step = step
+        self.loader = loader
+        self.budget_bytes = budget_mb * 1024 * 1024
+        self.retain = None if loader else True  # 첫 프레임 크기를 보고 결정
+        # 배치 예측 대기 중인 윈도우들이 걸쳐 있는 프레임 범위만큼만 보관
+        self._recent = deque(maxlen=seq_len + step * (window_batch - 1))
+        self.candidates = []  # [(prob, window_idx, frames)] - 확률 내림차순, 동점이면 앞 윈도우 우선 (frames=None이면 재디코딩)
+        self._loaded = (None, None)  # 마지막으로 재디코딩한 (window_idx, frames) - 같은 윈도우 반복 요청 시 재사용
+
+    def push(self, frame_idx: int, frame: np.ndarray):
+        if self.retain is None:
+            need = (self._recent.maxlen + self.top_k * self.seq_len) * frame.nbytes
+            self.retain = need <= self.budget_bytes
+            if not self.retain:
+                print(f"💾 후보 프레임 보관 생략 (필요 {need / 1024 ** 2:.0f}MB > 상한 {self.budget_bytes / 1024 ** 2:.0f}MB)"
+                      f" -> 후보 윈도우만 재디코딩")
+        if self.retain:
+            self._recent.append((frame_idx, frame))
+
+    def offer(self, window_idx: int, prob: float):
+        """예측이 끝난 윈도우를 후보로 제안. 상위 top_k 안에 들면 원본 프레임을 보관"""
+        if len(self.candidates) >= self.top_k and prob <= self.candidates[-1][0]:
+            return
+        frames = None
+        if self.retain:
+            start = window_idx * self.step
+            frames = [f for i, f in self._recent if start <= i < start + self.seq_len]
+        self.add(window_idx, prob, frames)
+
+    def frames_for(self, window_idx: int):
+        for _, idx, frames in self.candidates:
+            if idx == window_idx:
+                if frames is not None:
+                    return frames
+                if self._loaded[0] != window_idx:
+                    self._loaded = (window_idx, self.loader(window_idx))
+                return self._loaded[1]
+        return []
+
+    def add(self, window_idx: int, prob: float, frames):
+        """후보 등록 (frames=None이면 frames_for() 때 loader로 디코딩 - 구간 분할 분석에서 병합 후 사용)"""
+        self.candidates.append((prob, window_idx, frames))
+        self.candidates.sort(key=lambda c: (-c[0], c[1]))
+        del self.candidates[self.top_k:]
+
+    def ranked_windows(self):
+        """후보 윈도우 번호를 확률 순으로 반환"""
+        return [idx for _, idx, _ in self.candidates]
+
+# =====================================================================
+# 5. 디코딩 -> 전처리 -> 추론 파이프라인
+# =====================================================================
+class StageStats:
+    """단계별 처리 시간 / 입력 대기(starved) / 출력 대기(backpressure) 누적"""
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_sec = 0.0
+        self.wait_in_sec = 0.0
+        self.wait_out_sec = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, wait_in=0.0, wait_out=0.0, items=0):
+        with self._lock:
+            self.busy_sec += busy
+            self.wait_in_sec += wait_in
+            self.wait_out_sec += wait_out
+            self.items += items
+
+    def to_dict(self, wall_sec: float, workers: int = 1):
+        capacity = max(wall_sec * workers, 1e-9)
+        return {
+            "items": self.items,
+            "workers": workers,
+            "busy_sec": round(self.busy_sec, 3),
+            "wait_in_sec": round(self.wait_in_sec, 3),
+            "wait_out_sec": round(self.wait_out_sec, 3),
+            "utilization": round(self.busy_sec / capacity, 3),
+        }
+
+
+def iter_frames_serial(cap, preprocess_fn):
+    """단일 스레드 버전: (frame_idx, frame, preprocessed)를 순서대로 반환"""
+    frame_idx = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        yield frame_idx, frame, preprocess_fn(frame)
+        frame_idx += 1
+
+
+class ThreadedFramePipeline:
+    """
+    디코더 스레드 1개 -> 전처리(리사이즈) 스레드 N개 -> 소비자(추론, 호출한 스레드)
+    단계 사이는 크기가 제한된 큐로 연결되어 느린 단계가 있으면 앞 단계가 자동으로 대기(백프레셔).
+    cv2 디코딩/리사이즈는 GIL을 풀어주므로 스레드만으로도 코어를 나눠 쓸 수 있음.
+
+    사용법:
+        pipeline = ThreadedFramePipeline(cap, preprocess_fn)
+        for frame_idx, frame, preprocessed in pipeline: ...
+        pipeline.report()  # 단계별 사용률
+    """
+    _DONE = object()
+
+    def __init__(self, cap, preprocess_fn, workers: int = PIPELINE_PREPROCESS_WORKERS,
+                 queue_depth: int = PIPELINE_QUEUE_DEPTH):
+        self.cap = cap
+        self.preprocess_fn = preprocess_fn
+        self.workers = max(1, workers)
+        self._decoded = queue.Queue(maxsize=max(1, queue_depth))
+        self._processed = queue.Queue(maxsize=max(1, queue_depth))
+        self._stop = threading.Event()
+        self._error = None
+        self.stats = {
+            "decode": StageStats("decode"),
+            "preprocess": StageStats("preprocess"),
+            "inference": StageStats("inference"),
+        }
+        self._threads = []
+        self._started_at = None
+        self._finished_at = None
+
+    # ---------- 큐 유틸 (중단 요청 시 블로킹에서 빠져나오도록 timeout 루프) ----------
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return self._DONE
+
+    # ---------- 단계별 스레드 ----------
+    def _decode_loop(self):
+        stats = self.stats["decode"]
+        frame_idx = 0
+        try:
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                ret, frame = self.cap.read()
+                t1 = time.perf_counter()
+                if not ret: break
+                ok = self._put(self._decoded, (frame_idx, frame))
+                stats.add(busy=t1 - t0, wait_out=time.perf_counter() - t1, items=1)
+                if not ok: break
+                frame_idx += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            for _ in range(self.workers):
+                self._put(self._decoded, self._DONE)
+
+    def _preprocess_loop(self):
+        stats = self.stats["preprocess"]
+        try:
+            while True:
+                t0 = time.perf_counter()
+                item = self._get(self._decoded)
+                t1 = time.perf_counter()
+                if item is self._DONE: break
+                frame_idx, frame = item
+                out = self.preprocess_fn(frame)
+                t2 = time.perf_counter()
+                ok = self._put(self._processed, (frame_idx, frame, out))
+                stats.add(busy=t2 - t1, wait_in=t1 - t0, wait_out=time.perf_counter() - t2, items=1)
+                if not ok: break
+        except Exception as e:
+            self._error = e
+            self._stop.set()
+        finally:
+            self._put(self._processed, self._DONE)
+
+    # ---------- 소비자 (호출한 스레드) ----------
+    def __iter__(self):
+        self._started_at = time.perf_counter()
+        self._threads = [threading.Thread(target=self._decode_loop, daemon=True)]
+        self._threads += [threading.Thread(target=self._preprocess_loop, daemon=True)
+                          for _ in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+        stats = self.stats["inference"]
+        pending = {}  # 전처리 스레드가 여러 개라 순서가 섞여 들어옴 -> frame_idx 순으로 재정렬
+        next_idx = 0
+        done_workers = 0
+        try:
+            while True:
+                if next_idx in pending:
+                    item = pending.pop(next_idx)
+                    t_yield = time.perf_counter()
+                    yield item
+                    stats.add(busy=time.perf_counter() - t_yield, items=1)
+                    next_idx += 1
+                    continue
+                if done_workers == self.workers:
+                    break
+                t0 = time.perf_counter()
+                item = self._get(self._processed)
+                stats.add(wait_in=time.perf_counter() - t0)
+                if item is self._DONE:
+                    done_workers += 1
+                    continue
+                pending[item[0]] = item
+        finally:
+            self.close()
+
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        if self._finished_at is None and self._started_at is not None:
+            self._finished_at = time.perf_counter()
+
+    def report(self):
+        """단계별 사용률. utilization이 1에 가까운 단계가 처리량을 결정하는 병목"""
+        end = self._finished_at or time.perf_counter()
+        wall = end - (self._started_at or end)
+        report = {
+            "wall_sec": round(wall, 3),
+            "decode": self.stats["decode"].to_dict(wall),
+            "preprocess": self.stats["preprocess"].to_dict(wall, self.workers),
+            "inference": self.stats["inference"].to_dict(wall),
+        }
+        report["bottleneck"] = max(("decode", "preprocess", "inference"),
+                                   key=lambda k: report[k]["utilization"])
+        return report
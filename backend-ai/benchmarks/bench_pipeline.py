@@ -0,0 +1,215 @@
+"""
+분석 파이프라인 오프라인 벤치마크 (실제 모델 가중치 / 클라우드 인증 없이 CPU에서 실행)
+
+합성 영상을 만들고 스텁 모델(분류기, YOLO, OCR 엔진)을 주입해서
+analyze_local_video / PlateRecognizerModule.process_segment / HighAccuracyOCR.recognize_plate 의
+단계별 처리량, 지연시간 분위수(p50/p95/p99), 최대 메모리(RSS)를 측정
+
+사용 예) backend-ai 폴더에서
+    python -m benchmarks.bench_pipeline --seconds 20 --fps 30 --width 1920 --height 1080 --repeat 3
+    PIPELINE_THREADED=false python -m benchmarks.bench_pipeline      # 설정값별 비교
+    python -m benchmarks.bench_pipeline --json result.json            # 결과 저장
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from functools import partial
+
+# 스텁을 주입할 것이므로 import 시점의 실제 모델 로드는 끔
+os.environ.setdefault("AI_PRELOAD_MODELS", "false")
+
+import cv2
+import numpy as np
+
+from app.core.config import SEQUENCE_LENGTH
+from app.services.ai_service import AIService
+from app.services.chunked_analysis import ChunkedVideoAnalyzer
+from app.services.plate_ocr import PlateRecognizerModule, HighAccuracyOCR, MultiEngineOCR
+from benchmarks.synthetic_video import make_video
+from benchmarks.stubs import (
+    StubClassifier, StubVehicleDetector, StubPlateDetector, StubEasyOCR, StubPaddleOCR
+)
+
+
+def peak_rss_mb() -> float:
+    """프로세스 최대 RSS (MB)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux는 KB, macOS는 byte 단위
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+
+
+def summarize(latencies, items_per_run=None) -> dict:
+    arr = np.asarray(latencies, dtype=np.float64) * 1000.0
+    summary = {
+        "runs": len(arr),
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+        "mean_ms": round(float(arr.mean()), 2),
+    }
+    if items_per_run:
+        summary["throughput_per_sec"] = round(items_per_run / (arr.mean() / 1000.0), 1)
+    summary["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    return summary
+
+
+def build_service(args):
+    """스텁 모델을 주입한 AIService 생성"""
+    engines = {"easy": StubEasyOCR(args.plate_text, latency_ms=args.ocr_ms)}
+    if args.paddle:
+        engines["paddle"] = StubPaddleOCR(args.plate_text, latency_ms=args.ocr_ms)
+    ocr = HighAccuracyOCR(multi_ocr=MultiEngineOCR(engines=engines))
+    lpr = PlateRecognizerModule("stub", model=StubPlateDetector(latency_ms=args.det_ms), ocr=ocr)
+    # 구간 분할 분석: 구간 워커 프로세스에서도 스텁 분류기를 쓰도록 (pickle 가능한) 생성 함수를 넘김
+    chunked = ChunkedVideoAnalyzer(
+        workers=args.chunk_workers, min_frames=0,
+        classifier_factory=partial(StubClassifier, latency_ms=args.cls_ms),
+        detector_factory=partial(StubVehicleDetector, latency_ms=args.det_ms),
+    ) if args.chunk_workers else False
+    service = AIService(
+        model=StubClassifier(latency_ms=args.cls_ms),
+        obj_detector=StubVehicleDetector(latency_ms=args.det_ms),
+        lpr_system=lpr,
+        chunked=chunked,
+    )
+    return service, engines
+
+
+def collect_plate_crops(video_path, detector, limit):
+    """OCR 단독 측정용 번호판 크롭 수집"""
+    cap = cv2.VideoCapture(video_path)
+    crops = []
+    while len(crops) < limit:
+        ret, frame = cap.read()
+        if not ret: break
+        for box in detector(frame)[0].boxes:
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
+            crops.append(frame[y1:y2, x1:x2].copy())
+    cap.release()
+    return crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--static-seconds", type=float, default=0.0, help="영상 앞부분 정차(정지 화면) 구간 길이")
+    parser.add_argument("--plate-text", default="12가3456")
+    parser.add_argument("--font", default=None, help="번호판 한글 렌더링용 TTF 폰트 경로")
+    parser.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수")
+    parser.add_argument("--cls-ms", type=float, default=0.0, help="분류기 스텁 윈도우당 지연(ms)")
+    parser.add_argument("--det-ms", type=float, default=0.0, help="YOLO 스텁 호출당 지연(ms)")
+    parser.add_argument("--ocr-ms", type=float, default=0.0, help="OCR 엔진 스텁 호출당 지연(ms)")
+    parser.add_argument("--paddle", action="store_true", help="Paddle 스텁 엔진도 함께 사용")
+    parser.add_argument("--chunk-workers", type=int, default=0, help="구간 분할 분석 프로세스 수 (0이면 순차 분석)")
+    parser.add_argument("--video", default=None, help="합성 영상 대신 사용할 영상 경로")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    if args.video:
+        meta = {"path": args.video}
+    else:
+        violation_start = args.static_seconds + max(0.0, (args.seconds - args.static_seconds) / 2 - 1)
+        meta = make_video(
+            os.path.join(workdir, "synthetic.mp4"), seconds=args.seconds, fps=args.fps,
+            width=args.width, height=args.height, plate_text=args.plate_text,
+            violation=(violation_start, violation_start + 2.0),
+            static=(0.0, args.static_seconds) if args.static_seconds else None,
+            font_path=args.font,
+        )
+    video_path = meta["path"]
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    print(f"🎞️ 벤치마크 영상: {video_path} ({total_frames} frames)")
+
+    service, engines = build_service(args)
+    results = {"video": meta, "stages": {}}
+
+    # 1. analyze_local_video (디코딩 + 분류 + 탐지 + 번호판)
+    latencies, last = [], None
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        last = service.analyze_local_video(video_path)
+        latencies.append(time.perf_counter() - t0)
+    results["stages"]["analyze_local_video"] = summarize(latencies, items_per_run=total_frames)
+    results["analysis_result"] = last
+    results["pipeline_report"] = service.last_pipeline_report
+    if service.chunked:
+        # 구간 분할 결과가 순차 분석과 같은 구간/확률을 고르는지 확인
+        service.chunked.shutdown()
+        chunked, service.chunked = service.chunked, None
+        sequential = service.analyze_local_video(video_path)
+        service.chunked = chunked
+        results["chunked_matches_sequential"] = (
+            sequential.get("segment") == last.get("segment") and sequential.get("prob") == last.get("prob"))
+
+    # 2. process_segment (위반 구간 번호판 인식)
+    start_frame = (last.get("segment") or {}).get("start_frame", 0)
+    latencies = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        service.lpr_system.process_segment(video_path, start_frame, SEQUENCE_LENGTH)
+        latencies.append(time.perf_counter() - t0)
+    results["stages"]["process_segment"] = summarize(latencies, items_per_run=SEQUENCE_LENGTH)
+
+    # 3. recognize_plate (크롭 1장당 OCR 파이프라인)
+    crops = collect_plate_crops(video_path, StubPlateDetector(), limit=50)
+    latencies = []
+    for _ in range(args.repeat):
+        for crop in crops:
+            t0 = time.perf_counter()
+            service.lpr_system.ocr.recognize_plate(crop)
+            latencies.append(time.perf_counter() - t0)
+    if latencies:
+        results["stages"]["recognize_plate"] = summarize(latencies, items_per_run=1)
+
+    results["model_calls"] = {
+        "classifier_windows": service.model.windows,
+        "vehicle_detector_images": service.obj_detector.images,
+        "plate_detector_images": service.lpr_system.model.images,
+        "ocr_calls": {name: engine.calls for name, engine in engines.items()},
+        "ocr_cascade": dict(service.lpr_system.ocr.multi_ocr.stats,
+                            mode=service.lpr_system.ocr.multi_ocr.mode),
+    }
+    cache = service.lpr_system.ocr.cache
+    if cache is not None:
+        # 반복 실행 시 같은 크롭이 다시 들어오므로 캐시 적중이 측정에 포함됨 (끄려면 OCR_CACHE_ENABLED=false)
+        results["model_calls"]["ocr_cache"] = dict(cache.stats, hit_rate=round(cache.hit_rate, 3),
+                                                   entries=len(cache))
+
+    # 결과 출력
+    print("=" * 72)
+    print(f"{'stage':<22}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'items/s':>10}{'RSS(MB)':>10}")
+    for name, s in results["stages"].items():
+        print(f"{name:<22}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+              f"{s.get('throughput_per_sec', '-'):>10}{s['peak_rss_mb']:>10}")
+    print("-" * 72)
+    print(f"분석 결과: {last.get('result')} / 번호판: {last.get('plate')} / 확률: {last.get('prob')}")
+    if results["pipeline_report"]:
+        print(f"파이프라인 병목: {results['pipeline_report']['bottleneck']}")
+    print(f"모델 호출: {results['model_calls']}")
+    if "chunked_matches_sequential" in results:
+        print(f"구간 분할({args.chunk_workers}프로세스) 결과 = 순차 분석 결과: {results['chunked_matches_sequential']}")
+    print("=" * 72)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+        print(f"💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+OCR 전처리(PlateImagePreprocessor) 노이즈 제거 프로필별 크롭 1장당 지연시간 마이크로 벤치마크
+
+합성 번호판 크롭(크기 / 노이즈 세기 여러 단계)을 만들어 프로필(none / bilateral / nlm_fast / nlm / auto)마다
+preprocess_for_ocr 지연시간 분위수를 측정. 정확도-처리량 트레이드오프를 고를 때 사용
+
+사용 예) backend-ai 폴더에서
+    python -m benchmarks.bench_preprocess --repeat 20
+    python -m benchmarks.bench_preprocess --heights 24 48 96 --noise 0 5 15 --json preprocess.json
+"""
+import os
+import json
+import time
+import argparse
+
+os.environ.setdefault("AI_PRELOAD_MODELS", "false")
+
+import numpy as np
+
+from app.services.plate_ocr import PlateImagePreprocessor
+from benchmarks.bench_pipeline import summarize
+from benchmarks.synthetic_video import _render_plate
+
+
+def make_crops(heights, noise_levels, plate_text, font_path=None, seed=0):
+    """번호판 비율(약 4.5:1) 크롭을 높이 x 노이즈 표준편차 조합으로 생성"""
+    rng = np.random.default_rng(seed)
+    crops = []
+    for h in heights:
+        plate = _render_plate(plate_text, (int(h * 4.5), h), font_path).astype(np.float32)
+        for sigma in noise_levels:
+            noisy = plate + rng.normal(0.0, sigma, plate.shape) if sigma else plate
+            crops.append(np.clip(noisy, 0, 255).astype(np.uint8))
+    return crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 전처리 프로필별 마이크로 벤치마크")
+    parser.add_argument("--heights", type=int, nargs="+", default=[24, 40, 64, 110], help="크롭 높이(px) 목록")
+    parser.add_argument("--noise", type=float, nargs="+", default=[0.0, 4.0, 12.0], help="가우시안 노이즈 표준편차 목록")
+    parser.add_argument("--plate-text", default="12가3456")
+    parser.add_argument("--font", default=None, help="번호판 한글 렌더링용 TTF 폰트 경로")
+    parser.add_argument("--repeat", type=int, default=10, help="크롭 묶음 반복 횟수")
+    parser.add_argument("--json", default=None, help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    crops = make_crops(args.heights, args.noise, args.plate_text, args.font)
+    print(f"🧪 크롭 {len(crops)}장 (높이 {args.heights} x 노이즈 {args.noise}) x {args.repeat}회")
+
+    results = {}
+    for profile in PlateImagePreprocessor.PROFILES + ("auto",):
+        preprocessor = PlateImagePreprocessor(denoise=profile)
+        preprocessor.preprocess_for_ocr(crops[0])  # 버퍼/CLAHE 준비 (측정에서 제외)
+        latencies = []
+        for _ in range(args.repeat):
+            for crop in crops:
+                t0 = time.perf_counter()
+                preprocessor.preprocess_for_ocr(crop)
+                latencies.append(time.perf_counter() - t0)
+        results[profile] = summarize(latencies, items_per_run=1)
+        if profile == "auto":
+            results[profile]["chosen"] = {k: v for k, v in preprocessor.stats.items() if v}
+
+    print("=" * 62)
+    print(f"{'profile':<12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'crops/s':>10}{'RSS(MB)':>10}")
+    for name, s in results.items():
+        print(f"{name:<12}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+              f"{s['throughput_per_sec']:>10}{s['peak_rss_mb']:>10}")
+    print("-" * 62)
+    print(f"auto 프로필 선택 분포: {results['auto']['chosen']}")
+    print("=" * 62)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# 파일명: stubs.py
+# 실제 가중치 없이 분석 파이프라인을 돌리기 위한 경량 스텁 모델들
+# (ultralytics YOLO / 분류 백엔드 / EasyOCR / PaddleOCR 와 같은 호출 형태를 흉내냄)
+
+import time
+import cv2
+import numpy as np
+
+from benchmarks.synthetic_video import CAR_COLOR, PLATE_COLOR
+
+
+class _Array:
+    """box.xyxy[0].cpu().numpy() 형태의 호출을 지원하는 최소 텐서 흉내"""
+    def __init__(self, values):
+        self._values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+    def __getitem__(self, idx):
+        return self._values[idx]
+
+
+class StubBox:
+    def __init__(self, xyxy, cls_id: int, conf: float):
+        self.xyxy = [_Array(np.asarray(xyxy, dtype=np.float32))]
+        self.cls = np.array([cls_id])
+        self.conf = np.array([conf], dtype=np.float32)
+
+
+class StubResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def _color_boxes(frame, color, tol, min_area, aspect=None):
+    """지정 색상 영역을 찾아 (x1, y1, x2, y2) 목록으로 반환"""
+    lower = np.clip(np.array(color) - tol, 0, 255).astype(np.uint8)
+    upper = np.clip(np.array(color) + tol, 0, 255).astype(np.uint8)
+    mask = cv2.inRange(frame, lower, upper)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = []
+    for c in contours:
+        x, y, w, h = cv2.boundingRect(c)
+        if w * h < min_area:
+            continue
+        if aspect and not (aspect[0] <= w / max(h, 1) <= aspect[1]):
+            continue
+        boxes.append((x, y, x + w, y + h))
+    return boxes
+
+
+class _StubDetector:
+    """ultralytics YOLO처럼 model(frame | [frames], conf=, verbose=) -> [Result] 로 호출"""
+    names = {}
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.images = 0
+
+    def _detect(self, frame):
+        raise NotImplementedError
+
+    def __call__(self, source, conf=0.25, verbose=False, **kwargs):
+        frames = source if isinstance(source, list) else [source]
+        self.calls += 1
+        self.images += len(frames)
+        if self.latency_ms:
+            # 실제 모델의 호출당 지연을 흉내냄 (배치 1회 + 이미지당 비용)
+            time.sleep(self.latency_ms * (0.5 + 0.5 * len(frames)) / 1000.0)
+        return [StubResult(self._detect(f)) for f in frames]
+
+
+class StubVehicleDetector(_StubDetector):
+    """best.pt 대역: 차량(차체 색상) 영역을 'car'로 검출"""
+    names = {0: "car"}
+
+    def _detect(self, frame):
+        min_area = frame.shape[0] * frame.shape[1] // 100
+        return [StubBox(b, 0, 0.9) for b in _color_boxes(frame, CAR_COLOR, 25, min_area)]
+
+
+class StubPlateDetector(_StubDetector):
+    """license_plate_detector.pt 대역: 흰색 가로형 사각형을 번호판으로 검출"""
+    names = {0: "license_plate"}
+
+    def _detect(self, frame):
+        min_area = frame.shape[0] * frame.shape[1] // 2000
+        boxes = _color_boxes(frame, PLATE_COLOR, 20, min_area, aspect=(1.5, 8.0))
+        return [StubBox(b, 0, 0.85) for b in boxes]
+
+
+class StubClassifier:
+    """
+    위반 분류 백엔드 대역: predict(batch) -> (N, 3) 확률
+    윈도우 안에서 좌상단 위반 표시(빨간 사각형)가 보이는 프레임 비율을 첫 번째 클래스 확률로 사용
+    """
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self.windows = 0
+
+    def predict(self, batch):
+        self.calls += 1
+        self.windows += len(batch)
+        if self.latency_ms:
+            time.sleep(self.latency_ms * len(batch) / 1000.0)
+        corner = batch[:, :, 2:8, 2:8, :].mean(axis=(2, 3))  # (N, T, 3) BGR
+        marked = (corner[..., 2] > 0.8) & (corner[..., 0] < 0.2)
+        ratio = marked.mean(axis=1)
+        probs = np.stack([0.05 + 0.9 * ratio, 0.6 * (0.95 - 0.9 * ratio), 0.4 * (0.95 - 0.9 * ratio)], axis=1)
+        return probs.astype(np.float32)
+
+
+class StubEasyOCR:
+    """easyocr.Reader 대역: readtext(img) -> [(bbox, text, conf)]"""
+    def __init__(self, text: str, conf: float = 0.9, latency_ms: float = 0.0):
+        self.text = text
+        self.conf = conf
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def readtext(self, image, **kwargs):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        h, w = image.shape[:2]
+        return [([[0, 0], [w, 0], [w, h], [0, h]], self.text, self.conf)]
+
+    def readtext_batched(self, images, **kwargs):
+        self.calls += 1
+        if self.latency_ms:
+            # 배치 호출: 고정 오버헤드 1회 + 장당 인식 비용 일부
+            time.sleep(self.latency_ms * (0.5 + 0.1 * len(images)) / 1000.0)
+        return [[([[0, 0], [img.shape[1], 0], [img.shape[1], img.shape[0]], [0, img.shape[0]]],
+                  self.text, self.conf)] for img in images]
+
+
+class StubPaddleOCR:
+    """
+    PaddleOCR 대역: ocr(img, cls=True) -> [[ [box, (text, conf)] ]]
+    det=False 리스트 입력은 실제 PaddleOCR처럼 바깥 리스트 원소마다 인식기를 한 번씩 실행
+    - ocr([img, ...], det=False)   -> [[(text, conf)], ...]  (이미지마다 호출 1회, 지연도 이미지 수만큼)
+    - ocr([[img, ...]], det=False) -> [[(text, conf), ...]]  (크롭 묶음 하나를 배치 1회로 인식)
+    """
+    def __init__(self, text: str, conf: float = 0.85, latency_ms: float = 0.0):
+        self.text = text
+        self.conf = conf
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def ocr(self, image, det=True, cls=True, **kwargs):
+        if isinstance(image, list):
+            results = []
+            for item in image:
+                crops = item if isinstance(item, list) else [item]
+                self.calls += 1
+                if self.latency_ms:
+                    # 배치 호출: 고정 오버헤드 1회 + 장당 인식 비용 일부 (단일 이미지면 latency_ms와 같음)
+                    time.sleep(self.latency_ms * (0.9 + 0.1 * len(crops)) / 1000.0)
+                results.append([(self.text, self.conf) for _ in crops])
+            return results
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        h, w = image.shape[:2]
+        return [[[[[0, 0], [w, 0], [w, h], [0, h]], (self.text, self.conf)]]]
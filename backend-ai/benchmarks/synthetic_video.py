@@ -0,0 +1,79 @@
+# 파일명: synthetic_video.py
+# 벤치마크용 합성 블랙박스 영상 생성기 (OpenCV만 사용, 오프라인)
+
+import os
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# 스텁 모델들이 찾는 색상 (BGR)
+CAR_COLOR = (120, 40, 20)         # 차량 차체 (진한 파랑)
+PLATE_COLOR = (255, 255, 255)     # 번호판 바탕 (흰색)
+VIOLATION_MARK_COLOR = (0, 0, 255)  # 위반 구간 표시 (좌상단 빨간 사각형)
+
+
+def _render_plate(text: str, size: tuple, font_path: str = None) -> np.ndarray:
+    """번호판 이미지 렌더링. 한글 폰트가 주어지면 PIL로, 없으면 cv2.putText(영문/숫자)로 그림"""
+    w, h = size
+    plate = np.full((h, w, 3), PLATE_COLOR, dtype=np.uint8)
+    if font_path and os.path.exists(font_path):
+        img = Image.fromarray(plate)
+        font = ImageFont.truetype(font_path, int(h * 0.7))
+        ImageDraw.Draw(img).text((int(w * 0.05), int(h * 0.1)), text, font=font, fill=(0, 0, 0))
+        return np.asarray(img)
+    ascii_text = "".join(c if c.isascii() else " " for c in text)
+    scale = h / 40.0
+    (tw, th), _ = cv2.getTextSize(ascii_text, cv2.FONT_HERSHEY_SIMPLEX, scale, 2)
+    cv2.putText(plate, ascii_text, ((w - tw) // 2, (h + th) // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                scale, (0, 0, 0), max(1, int(scale * 2)), cv2.LINE_AA)
+    return plate
+
+
+def make_video(path: str, seconds: float = 10.0, fps: float = 30.0, width: int = 1280, height: int = 720,
+               plate_text: str = "12가3456", violation: tuple = (4.0, 6.0), static: tuple = None,
+               font_path: str = None) -> dict:
+    """
+    합성 영상 생성 후 메타데이터 반환
+    - 도로 차선이 매 프레임 움직이고, 차량(번호판 포함)이 천천히 가로질러 이동
+    - violation=(시작초, 끝초) 구간에는 좌상단에 빨간 표시 -> 스텁 분류기가 위반으로 판정
+    - static=(시작초, 끝초) 구간은 화면이 멈춤 (정차 구간, 모션 게이트 측정용)
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    total = int(seconds * fps)
+    plate_w, plate_h = width // 8, height // 18
+    plate = _render_plate(plate_text, (plate_w, plate_h), font_path)
+    car_w, car_h = width // 4, height // 4
+    mark = max(8, width // 10)
+
+    frozen = None
+    for i in range(total):
+        t = i / fps
+        if static and static[0] <= t < static[1] and frozen is not None:
+            writer.write(frozen)
+            continue
+
+        frame = np.full((height, width, 3), (70, 70, 70), dtype=np.uint8)
+        # 움직이는 차선
+        offset = (i * 12) % 80
+        for y in range(-80 + offset, height, 80):
+            cv2.rectangle(frame, (width // 2 - 6, y), (width // 2 + 6, y + 40), (220, 220, 220), -1)
+
+        # 차량 + 번호판
+        cx = int((0.2 + 0.5 * (i / max(1, total - 1))) * (width - car_w))
+        cy = height // 2
+        cv2.rectangle(frame, (cx, cy), (cx + car_w, cy + car_h), CAR_COLOR, -1)
+        px, py = cx + (car_w - plate_w) // 2, cy + car_h - plate_h - car_h // 10
+        frame[py:py + plate_h, px:px + plate_w] = plate
+
+        # 위반 구간 표시
+        if violation and violation[0] <= t < violation[1]:
+            frame[:mark, :mark] = VIOLATION_MARK_COLOR
+
+        frozen = frame
+        writer.write(frame)
+
+    writer.release()
+    return {
+        "path": path, "frames": total, "fps": fps, "width": width, "height": height,
+        "seconds": seconds, "plate_text": plate_text, "violation": violation, "static": static,
+    }
@@ -0,0 +1,148 @@
+"""
+위반 분류 모델(test_model.h5)을 TFLite / ONNX로 변환하고 Keras 결과와 비교하는 스크립트
+
+사용 예)
+    # TFLite int8 양자화 (캘리브레이션용 영상 지정) + Keras 대비 정합성 확인
+    python convert_model.py --format tflite --quantize int8 --calib-video samples/a.mp4 samples/b.mp4 --check
+
+    # ONNX 변환 (tf2onnx 필요: pip install tf2onnx)
+    python convert_model.py --format onnx --check
+
+    # 이미 변환된 모델의 정합성만 확인
+    python convert_model.py --format onnx --check-only
+
+변환이 끝나면 .env 에 CLASSIFIER_BACKEND=tflite (또는 onnx) 로 지정해서 사용
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+from app.core.config import (
+    MODEL_PATH, TFLITE_MODEL_PATH, ONNX_MODEL_PATH,
+    SEQUENCE_LENGTH, STEP_SIZE, TF_INPUT_SIZE
+)
+from app.services.inference_backend import KerasBackend, TFLiteBackend, OnnxBackend
+
+
+def sample_windows(video_paths, max_windows):
+    """영상에서 분석과 같은 방식(리사이즈 + /255, STEP_SIZE 간격)으로 윈도우를 뽑음"""
+    windows = []
+    for path in video_paths:
+        cap = cv2.VideoCapture(path)
+        frames = []
+        while len(windows) < max_windows:
+            ret, frame = cap.read()
+            if not ret: break
+            frames.append(cv2.resize(frame, TF_INPUT_SIZE))
+            if len(frames) == SEQUENCE_LENGTH:
+                windows.append(np.asarray(frames, dtype=np.float32) / 255.0)
+                frames = frames[STEP_SIZE:]
+        cap.release()
+    if not windows:
+        # 영상이 없으면 무작위 입력으로 대체 (정합성 확인용으로만 의미 있음)
+        print("⚠️ 캘리브레이션/검증 영상이 없어 무작위 입력을 사용합니다.")
+        w, h = TF_INPUT_SIZE
+        rng = np.random.default_rng(0)
+        windows = [rng.random((SEQUENCE_LENGTH, h, w, 3), dtype=np.float32) for _ in range(max_windows)]
+    return np.stack(windows)
+
+
+def convert_tflite(keras_model, output_path, quantize, calib_windows):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+
+    if quantize == "int8":
+        # 정수 전용 post-training 양자화 (입출력까지 int8)
+        def representative_dataset():
+            for window in calib_windows:
+                yield [window[np.newaxis]]
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    else:
+        if quantize == "dynamic":
+            # 가중치만 int8 (캘리브레이션 불필요)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        # LSTM 계열 레이어가 builtin 으로 안 내려가는 경우를 대비해 TF op 허용
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS
+        ]
+        converter._experimental_lower_tensor_list_ops = False
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(keras_model, output_path):
+    try:
+        import tf2onnx
+    except ImportError:
+        print("❌ tf2onnx가 설치되지 않았습니다. 'pip install tf2onnx'를 실행하세요.")
+        sys.exit(1)
+    import tensorflow as tf
+    spec = (tf.TensorSpec((None,) + tuple(keras_model.input_shape[1:]), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(keras_model, input_signature=spec, opset=13, output_path=output_path)
+
+
+def check_parity(reference, candidate, windows):
+    """Keras 출력과 변환 모델 출력 비교 (최대 오차, 판정 일치율, 윈도우당 지연시간)"""
+    def run(backend):
+        outputs, elapsed = [], []
+        for window in windows:
+            t0 = time.perf_counter()
+            outputs.append(backend.predict(window[np.newaxis])[0])
+            elapsed.append(time.perf_counter() - t0)
+        return np.asarray(outputs, dtype=np.float32), np.asarray(elapsed)
+
+    ref_out, ref_time = run(reference)
+    cand_out, cand_time = run(candidate)
+    max_diff = float(np.max(np.abs(ref_out - cand_out)))
+    agreement = float(np.mean(np.argmax(ref_out, axis=1) == np.argmax(cand_out, axis=1)))
+
+    print("=" * 60)
+    print(f"📏 정합성 ({candidate.name} vs keras, 윈도우 {len(windows)}개)")
+    print(f"   최대 확률 오차   : {max_diff:.5f}")
+    print(f"   판정(argmax) 일치: {agreement * 100:.1f}%")
+    print(f"   지연시간 p50     : keras {np.median(ref_time) * 1000:.1f} ms / "
+          f"{candidate.name} {np.median(cand_time) * 1000:.1f} ms")
+    print("=" * 60)
+    return max_diff, agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="위반 분류 모델 변환 (Keras -> TFLite / ONNX)")
+    parser.add_argument("--format", choices=["tflite", "onnx"], required=True)
+    parser.add_argument("--quantize", choices=["none", "dynamic", "int8"], default="none",
+                        help="TFLite 양자화 방식 (int8은 캘리브레이션 영상 권장)")
+    parser.add_argument("--input", default=MODEL_PATH, help="원본 Keras 모델 (.h5)")
+    parser.add_argument("--output", default=None, help="출력 경로 (기본: models/test_model.tflite|.onnx)")
+    parser.add_argument("--calib-video", nargs="*", default=[], help="캘리브레이션/검증용 영상")
+    parser.add_argument("--calib-windows", type=int, default=32, help="사용할 윈도우 수")
+    parser.add_argument("--check", action="store_true", help="변환 후 Keras 출력과 비교")
+    parser.add_argument("--check-only", action="store_true", help="변환 없이 비교만 수행")
+    args = parser.parse_args()
+
+    output = args.output or (TFLITE_MODEL_PATH if args.format == "tflite" else ONNX_MODEL_PATH)
+    windows = sample_windows(args.calib_video, args.calib_windows)
+    reference = KerasBackend(args.input)
+
+    if not args.check_only:
+        print(f"⏳ 변환 중: {args.input} -> {output} ({args.format}, quantize={args.quantize})")
+        if args.format == "tflite":
+            convert_tflite(reference.model, output, args.quantize, windows)
+        else:
+            convert_onnx(reference.model, output)
+        print(f"✅ 변환 완료: {output} ({os.path.getsize(output) / 1024 / 1024:.1f} MB)")
+
+    if args.check or args.check_only:
+        candidate = TFLiteBackend(output) if args.format == "tflite" else OnnxBackend(output)
+        check_parity(reference, candidate, windows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+번호판 트랙 투표 테스트 (합성 영상 + 스텁 검출기/OCR 엔진, 모델 가중치 없이 실행)
+
+사용 예) backend-ai 폴더에서
+    pip install pytest
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("AI_PRELOAD_MODELS", "false")
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from app.services.plate_ocr import PlateRecognizerModule, HighAccuracyOCR, MultiEngineOCR, PlateOCRCache
+from benchmarks.synthetic_video import make_video
+from benchmarks.stubs import StubPlateDetector, StubEasyOCR
+
+PLATE = "12가3456"
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    """앞 2초는 차량이 움직이고 뒤 2초는 화면이 멈춘 25fps 영상의 프레임 (움직임 50장, 정지 50장)"""
+    path = str(tmp_path_factory.mktemp("clip") / "clip.mp4")
+    make_video(path, seconds=4.0, fps=25.0, width=640, height=360, plate_text=PLATE,
+               violation=None, static=(2.0, 4.0))
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return {"moving": frames[:50], "static": frames[50:]}
+
+
+def _recognizer(cache):
+    ocr = HighAccuracyOCR(multi_ocr=MultiEngineOCR(engines={"easy": StubEasyOCR(PLATE)}), cache=cache)
+    ocr.cache = cache
+    return PlateRecognizerModule("stub", model=StubPlateDetector(), ocr=ocr)
+
+
+@pytest.mark.parametrize("part", ["moving", "static"])
+def test_cache_does_not_change_votes(clip, part):
+    # 캐시 적중도 프레임마다 1표 -> 캐시를 켜도 끈 것과 같은 번호판 / 표 수 / 조기 종료 시점
+    off = _recognizer(None).process_frames_detailed(clip[part])
+    on = _recognizer(PlateOCRCache()).process_frames_detailed(clip[part])
+
+    assert off["plate"] == PLATE
+    assert on["plate"] == off["plate"]
+    assert [p["votes"] for p in on["plates"]] == [p["votes"] for p in off["plates"]]
+    assert on["frames_used"] == off["frames_used"] and on["early_stopped"] == off["early_stopped"]
+    assert on["ocr_calls"] <= off["ocr_calls"]
+
+
+def test_repeated_clip_is_decided_from_cache(clip):
+    # 같은 영상을 다시 분석하면 OCR 엔진을 부르지 않고도 같은 표 수로 확정
+    recognizer = _recognizer(PlateOCRCache())
+    first = recognizer.process_frames_detailed(clip["moving"])
+    second = recognizer.process_frames_detailed(clip["moving"])
+    assert second["plate"] == first["plate"] == PLATE
+    assert [p["votes"] for p in second["plates"]] == [p["votes"] for p in first["plates"]]
+    assert second["early_stopped"] and second["frames_used"] == first["frames_used"]
+    assert second["ocr_calls"] == 0